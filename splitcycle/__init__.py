@@ -26,11 +26,55 @@ Open source contributions by Ananth Venkatesh and Youwen Wu
 
 __version__ = '1.0.0'
 
+from importlib import import_module
+from . import cache
 from . import core
-from . import utils
+from .cache import WinnerCache
+from .profiles import Profile, TopKBallots
+from .ranking import splitcycle_ranking
+from .stats import SplitCycleStats
 
 # export user-facing functions
 elect = core.elect
 splitcycle = core.splitcycle
+splitcycle_batch = core.splitcycle_batch
+SplitCycleEngine = core.SplitCycleEngine
+MarginMatrix = core.MarginMatrix
 
-__all__ = ['elect', 'splitcycle', 'utils']
+# submodules and classes imported on first access (see `__getattr__`), so
+# that `import splitcycle` does not pay for `tabulate`, the voter models
+# and the rest when only `elect` is needed
+_LAZY_MODULES = (
+    'large', 'methods', 'preflib', 'server', 'storage', 'subsets', 'sweep',
+    'utils', 'witnesses',
+)
+_LAZY_ATTRIBUTES = {
+    'MarginsAccumulator': 'tally',
+    'IncrementalCount': 'tally',
+}
+
+# pylint: disable=undefined-all-variable
+__all__ = [
+    'elect', 'splitcycle', 'splitcycle_batch', 'splitcycle_ranking',
+    'SplitCycleEngine', 'MarginMatrix', 'SplitCycleStats', 'WinnerCache',
+    'Profile', 'TopKBallots', 'MarginsAccumulator', 'IncrementalCount',
+    'cache', 'large', 'methods', 'preflib', 'server', 'storage', 'subsets',
+    'sweep', 'utils', 'witnesses',
+]
+# pylint: enable=undefined-all-variable
+
+
+def __getattr__(name):
+    '''Import lazily loaded submodules and classes on first access'''
+    if name in _LAZY_MODULES:
+        return import_module(f'.{name}', __name__)
+    if name in _LAZY_ATTRIBUTES:
+        module = import_module(f'.{_LAZY_ATTRIBUTES[name]}', __name__)
+        globals()[name] = getattr(module, name)
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    '''List lazily loaded names along with the loaded ones'''
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,6 @@
+'''Run the `splitcycle` command with `python -m splitcycle`'''
+
+import sys
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,159 @@
+'''
+Content-addressed memoization of SplitCycle winners
+
+Elections are identified by a hash of their margins matrix (its shape
+and values, as integers when they are whole), the candidates considered
+and the engine, so the same election is recognized however many times
+its margins are rebuilt.
+Pass a `WinnerCache` as `cache` to `splitcycle` (or `elect`):
+
+>>> cache = WinnerCache(max_entries=10000, directory='.splitcycle-cache')
+>>> splitcycle(margins, cache=cache)  # computed
+>>> splitcycle(margins_from_ballots(ballots), cache=cache)  # cached
+
+Entries are kept in memory up to `max_entries` and `max_bytes`,
+evicting the least recently used first. With a `directory`, every entry
+is also written there as a small JSON file, so results survive process
+restarts; entries evicted from memory are reloaded from disk on demand.
+'''
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+import numpy as np
+
+# estimated memory per cached entry, besides 8 bytes per winner
+ENTRY_BYTES = 200
+
+
+def election_key(margins, candidates=None, engine='search'):
+    '''
+    Return a hexadecimal digest identifying the winners of `margins`
+    considering `candidates` (`None` for all) with `engine`
+    '''
+    margins = np.asarray(margins)
+
+    # integer margins hash the same whatever dtype they are stored in
+    whole = margins.astype(np.int64)
+    if (whole == margins).all():
+        margins = whole
+
+    margins = np.ascontiguousarray(margins)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{margins.dtype.str}{margins.shape}{engine}'.encode())
+    digest.update(margins.data)
+    if candidates is not None:
+        digest.update(b'candidates')
+        digest.update(np.asarray(list(candidates), dtype=np.int64).data)
+
+    return digest.hexdigest()
+
+
+class WinnerCache:
+    '''
+    Bounded least-recently-used cache of winner lists by `election_key`,
+    with an optional on-disk tier
+    '''
+
+    def __init__(self, max_entries=1024, max_bytes=None, directory=None):
+        '''
+        `max_entries=1024`:
+            largest number of elections kept in memory
+
+        `max_bytes=None`:
+            approximate memory budget for entries kept in memory; if
+            `None`, only `max_entries` applies
+
+        `directory=None`:
+            directory to persist entries in; if `None`, entries are only
+            kept in memory
+        '''
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (
+            self.directory is not None and os.path.exists(self._path(key))
+        )
+
+    @property
+    def nbytes(self):
+        '''Approximate memory used by the entries kept in memory'''
+        return self._bytes
+
+    def _path(self, key):
+        '''Path of the on-disk entry for `key`'''
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        '''
+        Return the winners cached for `key` (a copy), or `None` if the
+        election is not cached
+        '''
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(self._entries[key])
+
+        if self.directory is not None:
+            try:
+                with open(self._path(key), encoding='utf-8') as file:
+                    winners = json.load(file)
+            except (OSError, ValueError):
+                pass
+            else:
+                self._remember(key, winners)
+                self.hits += 1
+                return list(winners)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, winners):
+        '''Cache the list of `winners` for `key`'''
+        winners = [int(winner) for winner in winners]
+        self._remember(key, winners)
+
+        if self.directory is not None:
+            # write then rename, so readers never see a partial entry
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                json.dump(winners, file)
+            os.replace(temporary, self._path(key))
+
+    def _remember(self, key, winners):
+        '''Keep `winners` in memory, evicting old entries over budget'''
+        if key in self._entries:
+            self._bytes -= ENTRY_BYTES + 8 * len(self._entries.pop(key))
+        self._entries[key] = tuple(winners)
+        self._bytes += ENTRY_BYTES + 8 * len(winners)
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+            and len(self._entries) > 1
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= ENTRY_BYTES + 8 * len(evicted)
+
+    def clear(self, disk=False):
+        '''
+        Empty the in-memory tier, and the on-disk tier too if `disk` is
+        `True`
+        '''
+        self._entries.clear()
+        self._bytes = 0
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,163 @@
+'''
+`splitcycle` command: print the SplitCycle winners of ballots or margins
+read from files or standard input
+
+Text input has one ballot (candidate ranks, as described in `elect`) or
+one row of a margins matrix per line, separated by spaces or commas;
+blank lines and lines starting with `#` are skipped. Ballots are tallied
+in batches as they are read, so inputs need not fit in memory. Binary
+ballot files (see `storage`) are recognized and memory-mapped.
+
+Example:
+$ splitcycle --candidates Alice,Bob,Carol election.txt
+$ generate_ballots | splitcycle --engine widest-path
+$ splitcycle --margins margins.txt
+'''
+
+import argparse
+import sys
+from itertools import chain, islice
+import numpy as np
+from .core import splitcycle
+from .tally import MarginsAccumulator
+
+# number of ballot lines parsed and tallied at once
+BATCH_LINES = 10000
+
+
+def _lines(path):
+    '''
+    Yield the non-empty, non-comment lines of the text file at `path`
+    (`-` for standard input)
+    '''
+    # pylint: disable-next=consider-using-with
+    file = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def _parse(lines):
+    '''Parse text `lines` of integers into a 2D array, one row per line'''
+    rows = [line.replace(',', ' ').split() for line in lines]
+    if len({len(row) for row in rows}) > 1:
+        raise ValueError('every line must have one entry per candidate')
+
+    return np.array(rows, dtype=np.int64)
+
+
+def _binary_ballots(path):
+    '''
+    Return the memory-mapped ballots of `path` if it is a binary ballot
+    file, otherwise `None`
+    '''
+    if path == '-':
+        return None
+
+    # only needed for binary files
+    from .storage import MAGIC, open_ballots  # pylint: disable=import-outside-toplevel
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            return None
+
+    return open_ballots(path)
+
+
+def read_ballots(paths, batch_lines=BATCH_LINES):
+    '''
+    Yield the ballots in the files at `paths` (text or binary, `-` for
+    standard input) as 2D arrays of at most `batch_lines` text ballots,
+    or as a whole memory-mapped binary file
+    '''
+    for path in paths:
+        ballots = _binary_ballots(path)
+        if ballots is not None:
+            yield ballots
+            continue
+
+        lines = _lines(path)
+        while (batch := _parse(islice(lines, batch_lines))).size:
+            yield batch
+
+
+def read_margins(paths, batch_lines=BATCH_LINES):
+    '''
+    Tally the ballots in the files at `paths` (see `read_ballots`)
+
+    Returns the voting margins matrix (as described in `splitcycle`)
+    '''
+    accumulator = None
+    for batch in read_ballots(paths, batch_lines):
+        if accumulator is None:
+            accumulator = MarginsAccumulator(batch.shape[1])
+        accumulator.add(batch)
+
+    if accumulator is None:
+        raise ValueError('no ballots were read')
+
+    return accumulator.margins
+
+
+def _parser():
+    '''Return the argument parser of the `splitcycle` command'''
+    parser = argparse.ArgumentParser(
+        prog='splitcycle',
+        description='Print the SplitCycle winners of an election, one '
+        'per line.',
+    )
+    parser.add_argument(
+        'files', nargs='*', default=['-'],
+        help='text or binary ballot files (default: standard input)',
+    )
+    parser.add_argument(
+        '-m', '--margins', action='store_true',
+        help='read a margins matrix, one row per line, instead of ballots',
+    )
+    parser.add_argument(
+        '-c', '--candidates',
+        help='comma-separated candidate names, in ballot order',
+    )
+    parser.add_argument(
+        '-e', '--engine', choices=('search', 'widest-path'),
+        default='search', help='how defeats are determined',
+    )
+    parser.add_argument(
+        '--bfs', action='store_true',
+        help='use breadth-first instead of depth-first search',
+    )
+
+    return parser
+
+
+def main(argv=None):
+    '''Run the `splitcycle` command with arguments `argv`'''
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    try:
+        if args.margins:
+            margins = _parse(chain.from_iterable(map(_lines, args.files)))
+        else:
+            margins = read_margins(args.files)
+
+        names = range(margins.shape[0]) if args.candidates is None \
+            else args.candidates.split(',')
+        if len(names) != margins.shape[0]:
+            raise ValueError(
+                f'{len(names)} candidate names given for '
+                f'{margins.shape[0]} candidates'
+            )
+
+        winners = splitcycle(margins, dfs=not args.bfs, engine=args.engine)
+    except (OSError, TypeError, ValueError) as error:
+        parser.exit(1, f'{parser.prog}: error: {error}\n')
+
+    for winner in winners:
+        print(names[winner])
+
+    return 0
@@ -1,9 +1,25 @@
 '''Core utilities for SplitCycle package'''
 
 import os
-from multiprocessing import Pool
+import pickle
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
 import numpy as np
-from .errors import not_enough_candidates
+from .errors import (
+    non_integer_margins, not_enough_candidates, not_margin_like,
+)
+from .cache import election_key
+from .profiles import Profile, TopKBallots
+from .shared import attach, release_workers, share, start_pool
+from .stats import SplitCycleStats
+
+# memory budget (in bytes) for one chunk of pairwise ballot comparisons
+CHUNK_BYTES = 1 << 24
+
+# below this many candidates, searches run in-process without a pool
+SERIAL_THRESHOLD = 100
 
 
 def is_square(matrix):
@@ -35,42 +51,37 @@ def is_margin_like(matrix):
     return has_reverse_diagonal_symmetry(matrix) and has_zero_diagonal(matrix)
 
 
-def is_splitcycle_winner(work):
+def has_strong_path(matrix, source, target, k, visited=None):
     '''
-    Determine which candidates satisfy the criteria to be considered
-    SplitCycle winners
-    
-    `work`:
-        tuple with:
-        (all_candidates, dfs, considered_candidates, margins) 
-
-    Returns a pruned list of identified winners
+    Given a square `matrix`, return `True` if there is a path from
+    `source` to `target` in the associated directed graph, where
+    each edge has a weight greater than or equal to `k`, and `False`
+    otherwise.
+
+    `visited=None`:
+        boolean array (initially all `False`) in which searched nodes
+        are marked, e.g. to count them; if `None`, one is allocated
     '''
-    def has_strong_path(matrix, source, target, k):
-        '''
-        Given a square `matrix`, return `True` if there is a path from
-        `source` to `target` in the associated directed graph, where
-        each edge has a weight greater than or equal to `k`, and `False`
-        otherwise.
-        '''
+    if visited is None:
         n = matrix.shape[0]  # `A` is square
         # keep track of visited nodes (initially all `False`)
         visited = np.zeros(n, dtype=bool)
-        visited[source] = True  # do not revisit the `source` node
-
-        def bfs(nodes):
-            '''
-            Breadth-first search implementation:
-            Search starting from `nodes` in `matrix` until a path to
-            `target` is found or until all nodes are searched. Since 
-            Condorcet cycles are exceedingly rare in real elections and
-            typically do not involve many candidates[1], a breadth-first
-            search of the margins graph will be fastest to detect such a
-            cycle.
-
-            [1] (Gehrlein and Lepelley, "Voting Paradoxes and Group
-                Coherence")
-            '''
+    visited[source] = True  # do not revisit the `source` node
+
+    def bfs(nodes):
+        '''
+        Breadth-first search implementation:
+        Search starting from `nodes` in `matrix` until a path to
+        `target` is found or until all nodes are searched. Since 
+        Condorcet cycles are exceedingly rare in real elections and
+        typically do not involve many candidates[1], a breadth-first
+        search of the margins graph will be fastest to detect such a
+        cycle.
+
+        [1] (Gehrlein and Lepelley, "Voting Paradoxes and Group
+            Coherence")
+        '''
+        while nodes:
             queue = []  # nodes to search next cycle
 
             for node in nodes:
@@ -84,54 +95,81 @@ def is_splitcycle_winner(work):
                     if weight >= k and not visited[neighbor]:
                         queue.append(neighbor)
 
-            return bfs(queue) if queue else False
+            nodes = queue
 
-        return bfs([source])
+        return False
 
-    def has_strong_path_dfs(matrix, source, target, k):
-        '''
-        Given a square `matrix`, return `True` if there is a path from
-        `source` to `target` in the associated directed graph, where
-        each edge has a weight greater than or equal to `k`, and `False`
-        otherwise.
-
-        This function is equivalent to `has_strong_path` but uses a
-        depth-first search implementation instead of breadth-first
-        search when searching for strong paths. It is included for
-        comparison and testing purposes.
-        '''
+    return bfs([source])
+
+
+def has_strong_path_dfs(matrix, source, target, k, visited=None):
+    '''
+    Given a square `matrix`, return `True` if there is a path from
+    `source` to `target` in the associated directed graph, where
+    each edge has a weight greater than or equal to `k`, and `False`
+    otherwise.
+
+    This function is equivalent to `has_strong_path` but uses a
+    depth-first search implementation instead of breadth-first
+    search when searching for strong paths. It is included for
+    comparison and testing purposes.
+
+    `visited=None`:
+        as in `has_strong_path`
+    '''
+    if visited is None:
         n = matrix.shape[0]  # `A` is square
         # keep track of visited nodes (initially all `False`)
         visited = np.zeros(n, dtype=bool)
 
-        def dfs(node):
-            '''
-            Depth-first search implementation:
-            Search starting from `node` in `matrix` until a path to
-            `target` is found or until all nodes are searched.
-            '''
+    def dfs(node):
+        '''
+        Depth-first search implementation:
+        Search starting from `node` in `matrix` until a path to
+        `target` is found or until all nodes are searched. An explicit
+        stack is used instead of recursion, so long paths (with many
+        candidates) do not hit Python's recursion limit.
+        '''
+        stack = [node]
+
+        while stack:
+            node = stack.pop()
             if node == target:
                 # path to target exists
                 return True
+            if visited[node]:
+                continue
 
             visited[node] = True  # mark node as visited
 
-            # search all neighbors that have not been visited
-            for neighbor, weight in enumerate(matrix[node, :]):
-                if weight >= k and not visited[neighbor]:
-                    if dfs(neighbor):
-                        return True
+            # search all neighbors that have not been visited, lowest
+            # index first
+            neighbors = (matrix[node, :] >= k) & ~visited
+            stack.extend(np.flatnonzero(neighbors)[::-1])
+
+        return False
 
-            return False
+    return dfs(source)
 
-        return dfs(source)
 
+def is_splitcycle_winner(work):
+    '''
+    Determine which candidates satisfy the criteria to be considered
+    SplitCycle winners
+    
+    `work`:
+        tuple with:
+        (all_candidates, dfs, considered_candidates, margins) 
+        where `margins` may be a `shared.SharedHandle`
+
+    Returns a pruned list of identified winners
+    '''
     all_candidates = work[0]
     dfs = work[1]
     finder = has_strong_path_dfs if dfs else has_strong_path
     considered_candidates = work[2]
     winners = set(considered_candidates)
-    margins = work[3]
+    margins = attach(work[3])
 
     for a in considered_candidates:
         # `a` is not a Condorcet winner
@@ -161,7 +199,528 @@ def is_splitcycle_winner(work):
     return winners
 
 
-def splitcycle(margins, candidates=None, dfs=True):
+def count_splitcycle_winners(work):
+    '''
+    Instrumented version of `is_splitcycle_winner`, taking the same
+    `work` tuple
+
+    Returns a tuple `(winners, counters)` of the pruned list of
+    identified winners and a dictionary of counters for this worker
+    (see `SplitCycleStats.add_worker`)
+    '''
+    start = time.perf_counter()
+    all_candidates, dfs, considered_candidates, margins = work
+    margins = attach(margins)
+    finder = has_strong_path_dfs if dfs else has_strong_path
+    winners = set(considered_candidates)
+    visited = np.zeros(margins.shape[0], dtype=bool)
+    searches = nodes_visited = early_exits = 0
+
+    # same search as `is_splitcycle_winner`, counting as it goes
+    for a in considered_candidates:
+        for b in all_candidates:
+            if margins[a, b] < 0:
+                visited[:] = False
+                searches += 1
+                found = finder(margins, a, b, -margins[a, b], visited)
+                nodes_visited += int(np.count_nonzero(visited))
+                if not found:
+                    winners.discard(a)
+                    early_exits += 1
+                    break
+
+    return winners, {
+        'pid': os.getpid(),
+        'candidates': len(considered_candidates),
+        'searches': searches,
+        'nodes_visited': nodes_visited,
+        'early_exits': early_exits,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def condorcet_winner(margins):
+    '''
+    Return the index of the Condorcet winner of `margins` (the candidate
+    with a positive margin over every other candidate), or `None` if
+    there is none
+    '''
+    beats = np.count_nonzero(np.asarray(margins) > 0, axis=1)
+    winners = np.flatnonzero(beats == len(beats) - 1)
+
+    return int(winners[0]) if len(winners) else None
+
+
+def smith_set(margins):
+    '''
+    Return a sorted list of the candidates in the Smith set of `margins`:
+    the smallest set of candidates that all have a positive margin over
+    every candidate outside it (the top strongly connected component of
+    the majority graph)
+
+    Every SplitCycle winner lies in the Smith set, since no path of
+    positive margins leads from outside the set back into it; a
+    Condorcet winner is the Smith set on its own.
+
+    Candidates that are not beaten by more candidates come first in the
+    majority graph, so the Smith set is the shortest prefix of the
+    candidates sorted by number of non-losses that beats everyone else.
+    Found with prefix sums in `O(n^2)` time.
+    '''
+    margins = np.asarray(margins)
+    n = margins.shape[0]
+    if not n:
+        return []
+
+    order = np.argsort(-np.count_nonzero(margins >= 0, axis=1), kind='stable')
+    beats = margins[np.ix_(order, order)] > 0
+
+    # `wins_out[k - 1]` counts wins of the first `k` candidates over the
+    # remaining `n - k`
+    prefix = np.cumsum(beats, axis=0)
+    sizes = np.arange(1, n + 1)
+    wins_out = prefix[sizes - 1].sum(axis=1) \
+        - np.cumsum(prefix, axis=1)[sizes - 1, sizes - 1]
+    size = int(np.argmax(wins_out == sizes * (n - sizes))) + 1
+
+    return sorted(order[:size].tolist())
+
+
+def strongest_paths(margins):
+    '''
+    Compute the strength of the strongest (widest) path between every
+    pair of candidates in the directed graph represented by `margins`,
+    where the strength of a path is the smallest margin along it
+
+    A vectorized Floyd-Warshall pass: after considering candidate `k` as
+    an intermediate node, `strengths[i, j]` is the strength of the
+    strongest path from `i` to `j` through nodes `0..k` only.
+
+    `margins` may also be a stack of matrices (any leading axes), in
+    which case every matrix in the stack is processed at once.
+
+    Returns a matrix `strengths` such that there is a path from `i` to
+    `j` with every edge weight at least `k > 0` if and only if
+    `strengths[i, j] >= k`
+    '''
+    strengths = np.array(margins, copy=True)
+    n = strengths.shape[-1]
+
+    for k in range(n):
+        # row and column `k` cannot improve through `k` itself, so the
+        # update can safely be done in place
+        np.maximum(
+            strengths,
+            np.minimum(
+                strengths[..., :, k, np.newaxis],
+                strengths[..., np.newaxis, k, :],
+            ),
+            out=strengths,
+        )
+
+    return strengths
+
+
+def defeat_matrix(margins, strengths=None):
+    '''
+    Compute the Split Cycle defeat relation of `margins`: `x` defeats
+    `y` if `margins[x, y] > 0` and there is no path from `y` back to `x`
+    of strength at least `margins[x, y]`
+
+    `strengths=None`:
+        strongest path matrix of `margins` (see `strongest_paths`); if
+        `None`, it is computed
+
+    Like `strongest_paths`, `margins` may be a stack of matrices.
+
+    Returns a boolean matrix `defeats` with `defeats[x, y]` set if and
+    only if `x` defeats `y`
+    '''
+    if strengths is None:
+        strengths = strongest_paths(margins)
+
+    return (margins > 0) & (np.swapaxes(strengths, -1, -2) < margins)
+
+
+def stability_radius(margins, strengths=None):
+    '''
+    Number of additional ballots that cannot change the SplitCycle
+    winners of `margins`, however they are cast
+
+    Each ballot moves every margin by at most one, and so moves the
+    strength of every path by at most one. A defeat of `y` by `x`
+    survives `r` more ballots if `margins[x, y] - r > 0` and
+    `strengths[y, x] + r < margins[x, y] - r`; a non-defeat survives if
+    `margins[x, y] + r <= 0` or `strengths[y, x] - r >= margins[x, y] +
+    r`. The winners are locked for `r` ballots if every loser keeps one
+    defeat and every winner keeps all of its non-defeats. Margins are
+    bounded independently, so the result is a safe lower bound.
+
+    `strengths=None`:
+        strongest path matrix of `margins` (see `strongest_paths`); if
+        `None`, it is computed
+
+    Returns the largest such number of ballots (`-1` if none is safe;
+    infinite for a single candidate)
+    '''
+    margins = np.asarray(margins, dtype=float)
+    if strengths is None:
+        strengths = strongest_paths(margins)
+
+    reverse = strengths.T  # `reverse[x, y]` is `strengths[y, x]`
+    defeats = (margins > 0) & (reverse < margins)
+
+    # ballots each defeat `x` over `y` survives
+    keep = np.where(
+        defeats, np.minimum(margins - 1, (margins - reverse - 1) // 2), -1
+    )
+    # ballots each non-defeat of `x` over `y` survives
+    hold = np.where(
+        defeats, -1, np.maximum(-margins, (reverse - margins) // 2)
+    )
+    np.fill_diagonal(hold, np.inf)  # candidates cannot defeat themselves
+
+    losers = defeats.any(axis=0)
+    radius = min(
+        keep.max(axis=0)[losers].min(initial=np.inf),
+        hold.min(axis=0)[~losers].min(initial=np.inf),
+    )
+
+    return radius if np.isinf(radius) else int(radius)
+
+
+class MarginMatrix:
+    '''
+    Voting margins matrix (as described in `splitcycle`) validated once
+    at construction, with derived structures computed lazily and cached
+
+    The margins are stored as a read-only integer array, so the cached
+    structures can never go stale. `splitcycle` accepts a `MarginMatrix`
+    in place of an array and then skips validation and answers from the
+    cached defeat relation whatever the engine, so repeated queries on
+    the same election are nearly free.
+
+    Example:
+    >>> matrix = MarginMatrix.from_ballots(ballots)
+    >>> splitcycle(matrix)
+    >>> matrix.defeats  # cached by the call above
+    '''
+
+    __slots__ = ('values', '_strengths', '_defeats', '_winners')
+
+    def __init__(self, margins):
+        '''
+        `margins`:
+            a margins matrix with integer entries (see `splitcycle`)
+        '''
+        margins = np.asarray(margins)
+        if not is_margin_like(margins):
+            not_margin_like()
+        if not np.array_equal(margins, np.round(margins)):
+            non_integer_margins()
+
+        self.values = margins.astype(np.int64)
+        self.values.setflags(write=False)
+        self._strengths = None
+        self._defeats = None
+        self._winners = None
+
+    @classmethod
+    def from_ballots(cls, ballots, chunk_size=None):
+        '''
+        Build the margins matrix of `ballots` (see
+        `margins_from_ballots`)
+        '''
+        wins = pairwise_wins(ballots, chunk_size)
+        return cls(wins - wins.T)
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.values if dtype is None else self.values.astype(dtype)
+        return values.copy() if copy and values is self.values else values
+
+    def __repr__(self):
+        return f'MarginMatrix({self.values!r})'
+
+    @property
+    def shape(self):
+        '''Shape of the margins matrix'''
+        return self.values.shape
+
+    @property
+    def strengths(self):
+        '''Strongest path matrix (see `strongest_paths`)'''
+        if self._strengths is None:
+            self._strengths = strongest_paths(self.values)
+        return self._strengths
+
+    @property
+    def defeats(self):
+        '''Split Cycle defeat relation (see `defeat_matrix`)'''
+        if self._defeats is None:
+            self._defeats = defeat_matrix(self.values, self.strengths)
+        return self._defeats
+
+    def winners(self):
+        '''Return a sorted list of all SplitCycle winners'''
+        if self._winners is None:
+            self._winners = np.flatnonzero(
+                ~self.defeats.any(axis=0)
+            ).tolist()
+        return list(self._winners)
+
+
+class SplitCycleEngine:
+    '''
+    Long-lived executor for the `search` engine of `splitcycle` that
+    owns a pool of worker processes across calls
+
+    Elections with fewer than `serial_threshold` candidates are
+    evaluated in-process, since spawning workers and copying `margins`
+    to them costs more than the searches themselves. Larger elections
+    are split into small chunks of candidates that are handed out to
+    workers dynamically as they finish, so that one slow chunk does not
+    hold up the rest. The pool is created on first use (or by `start`),
+    once even when the engine is shared between threads; call `close`
+    (or use the engine as a context manager) to shut it down.
+
+    Example:
+    >>> with SplitCycleEngine() as executor:
+    ...     for margins in elections:
+    ...         splitcycle(margins, executor=executor)
+    '''
+
+    def __init__(
+            self, processes=None, serial_threshold=SERIAL_THRESHOLD,
+            dispatch_size=None
+        ):
+        '''
+        `processes=None`:
+            number of worker processes; if `None`, use all cores
+
+        `serial_threshold=SERIAL_THRESHOLD`:
+            smallest number of candidates for which the pool is used
+
+        `dispatch_size=None`:
+            number of candidates handed to a worker at a time; if
+            `None`, aim for about four chunks per worker
+        '''
+        self.processes = os.cpu_count() if processes is None else processes
+        self.serial_threshold = serial_threshold
+        self.dispatch_size = dispatch_size
+        self._pool = self._barrier = None
+        self._sharing = 0  # calls with an array shared with the workers
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        '''Shut down the worker pool, if it was started'''
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+    def start(self):
+        '''
+        Start the worker pool now rather than on first use, if elections
+        are ever sent to it
+        '''
+        if self.processes > 1:
+            _ = self.pool
+
+    @property
+    def pool(self):
+        '''Worker pool, started on first access'''
+        with self._lock:
+            if self._pool is None:
+                # the pool outlives this call by design; see `close`
+                self._pool, self._barrier = start_pool(self.processes)
+            return self._pool
+
+    @contextmanager
+    def _shared(self, array):
+        '''
+        Share `array` with the workers for the duration of a `with`
+        block, yielding the payload tasks should carry: a handle to a
+        shared memory copy of large arrays, small arrays themselves
+
+        The workers release their mappings of the copy once the last of
+        the calls sharing arrays concurrently (e.g. from several threads)
+        exits, so that it does not stay resident until the next call.
+        Releasing then finds the workers idle instead of waiting for the
+        tasks of other calls.
+        '''
+        # start the pool before any segment exists: forking it while
+        # another thread registers a segment with the resource tracker
+        # would leave the tracker's lock held in the workers
+        pool = self.pool
+        shared = share(array)
+        if shared is None:
+            yield array
+            return
+
+        with self._lock:
+            self._sharing += 1
+        try:
+            with shared:
+                yield shared.handle
+        finally:
+            with self._lock:
+                self._sharing -= 1
+                last = not self._sharing
+            if last:
+                release_workers(pool, self._barrier)
+
+    def run(self, margins, candidates, dfs=True, stats=None):
+        '''
+        Return a sorted list of the SplitCycle winners of a validated
+        `margins` matrix, considering defeats by `candidates` only (see
+        `splitcycle`)
+
+        `stats=None`:
+            `SplitCycleStats` to record timings and counters in
+        '''
+        n = margins.shape[0]  # `margins` is square
+
+        if n < self.serial_threshold or self.processes <= 1:
+            work = (candidates, dfs, range(n), margins)
+            if stats is None:
+                return sorted(is_splitcycle_winner(work))
+
+            with stats.phase('search'):
+                winners, counters = count_splitcycle_winners(work)
+            stats.add_worker(counters)
+            return sorted(winners)
+
+        size = self.dispatch_size
+        if size is None:
+            size = max(1, n // (4 * self.processes))
+
+        # large matrices are mapped by workers from shared memory rather
+        # than pickled into every task
+        with self._shared(margins) as payload:
+            # hand out small chunks of candidate indices as workers free
+            # up
+            work = (
+                (candidates, dfs, range(start, min(start + size, n)), payload)
+                for start in range(0, n, size)
+            )
+            if stats is None:
+                # gather results
+                return sorted(set().union(
+                    *self.pool.imap_unordered(is_splitcycle_winner, work)
+                ))
+
+            with stats.phase('pool_startup'):
+                pool = self.pool
+            with stats.phase('pickling'):
+                work = list(work)
+                stats.payload_bytes += sum(
+                    len(pickle.dumps(task)) for task in work
+                )
+            with stats.phase('search'):
+                result = list(
+                    pool.imap_unordered(count_splitcycle_winners, work)
+                )
+
+        # gather results
+        winners = set()
+        for worker_winners, counters in result:
+            winners |= worker_winners
+            stats.add_worker(counters)
+
+        return sorted(winners)
+
+    def tally(self, ballots, chunk_size=None):
+        '''
+        Return the voting margins matrix of `ballots` (see
+        `margins_from_ballots`), splitting the ballots across the worker
+        pool, which maps them from shared memory
+
+        Profiles, sparse and memory-mapped ballots and fewer than
+        `serial_threshold` ballots per worker are tallied in-process.
+        '''
+        if (
+            isinstance(ballots, (Profile, TopKBallots, np.memmap))
+            or len(ballots) < self.serial_threshold * self.processes
+        ):
+            return margins_from_ballots(ballots, chunk_size)
+
+        ballots = np.asarray(ballots)
+        size = -(-len(ballots) // (4 * self.processes))
+        with self._shared(ballots) as payload:
+            work = (
+                (payload, start, start + size, chunk_size)
+                for start in range(0, len(ballots), size)
+            )
+            wins = sum(self.pool.imap_unordered(_pairwise_wins_rows, work))
+
+        # i beats j on `wins[i, j]` ballots and loses on `wins[j, i]`
+        return (wins - wins.T).astype(float)
+
+
+def _pairwise_wins_rows(work):
+    '''
+    Return `pairwise_wins` of the rows `start` to `stop` of `ballots`,
+    given a `work` tuple `(ballots, start, stop, chunk_size)` where
+    `ballots` may be a `shared.SharedHandle`
+    '''
+    ballots, start, stop, chunk_size = work
+    return pairwise_wins(attach(ballots)[start:stop], chunk_size)
+
+
+@lru_cache(maxsize=None)
+def default_engine():
+    '''Shared `SplitCycleEngine` used when no executor is given'''
+    return SplitCycleEngine()
+
+
+def _widest_path_winners(margins, candidates, phase):
+    '''
+    Return a sorted list of the SplitCycle winners of a validated
+    `margins` matrix (or `MarginMatrix`, reusing its cached structures)
+    with the `widest-path` engine of `splitcycle`, timing its phases
+    with the `phase` context manager factory
+    '''
+    with phase('strongest_paths'):
+        strengths = margins.strengths if isinstance(margins, MarginMatrix) \
+            else strongest_paths(margins)
+    with phase('defeats'):
+        defeats = margins.defeats if isinstance(margins, MarginMatrix) \
+            else defeat_matrix(margins, strengths)
+        # a candidate loses if it is defeated by any considered candidate
+        defeated = defeats[list(candidates), :].any(axis=0)
+
+    return np.flatnonzero(~defeated).tolist()
+
+
+def _cached_winners(cache, margins, candidates, engine, compute):
+    '''
+    Return the winners of an election from `cache` (a
+    `cache.WinnerCache`), calling `compute` and caching its result if
+    the election is not cached yet
+    '''
+    key = election_key(
+        margins.values if isinstance(margins, MarginMatrix) else margins,
+        candidates, engine,
+    )
+    winners = cache.get(key)
+    if winners is None:
+        winners = compute()
+        cache.put(key, winners)
+
+    return winners
+
+
+def splitcycle(  # pylint: disable=too-many-arguments,too-many-branches
+        margins, candidates=None, dfs=True, engine='search', executor=None,
+        *, stats=None, fast_path=True, cache=None
+    ):
     '''
     If x has a positive margin over y and there is no path from y back
     to x of strength at least the margin of x over y, then x defeats y.
@@ -171,7 +730,9 @@ def splitcycle(margins, candidates=None, dfs=True):
         a square matrix with margins of victory (positive) or defeat
         (negative) between candidates on its first axis and their
         opponents on the second; should be symmetric over the diagonal
-        (which should be zero, as candidates cannot defeat themselves)
+        (which should be zero, as candidates cannot defeat themselves).
+        May be a `MarginMatrix`, which is not validated again and whose
+        cached defeat relation is used whatever the `engine`
 
     `candidates=None`:
         if `None`, use the candidates in `margins` 
@@ -180,91 +741,206 @@ def splitcycle(margins, candidates=None, dfs=True):
         if `False`, use breadth-first search instead of default
         depth-first search implementation
 
+    `engine='search'`:
+        how defeats are determined; options are listed below:
+
+        - `search`: run a separate strong path search (see `dfs`) for
+          every losing pair of candidates, spread over all cores
+        - `widest-path`: compute the strongest path between all pairs
+          of candidates once (see `strongest_paths`) and derive every
+          defeat from it; much faster for large numbers of candidates
+
+    `executor=None`:
+        `SplitCycleEngine` running the `search` engine; if `None`, use a
+        shared engine whose worker pool persists across calls
+
+    `stats=None`:
+        `SplitCycleStats` to record per-phase timings and search
+        counters in, or a callable that is passed a new
+        `SplitCycleStats` for this call once it completes; if `None`,
+        nothing is recorded
+
+    `fast_path=True`:
+        if `True` and `candidates` is `None`, first find the Smith set
+        (see `smith_set`) and only search within it; a Condorcet winner
+        is returned without any path search. Not used for a
+        `MarginMatrix`, whose cached defeats already cover the whole
+        election
+
+    `cache=None`:
+        `cache.WinnerCache` to look the election up in before computing
+        its winners, and to store them in after; if `None`, always
+        compute
+
     Returns a sorted list of all SplitCycle winners
     '''
-    if not is_margin_like(margins):
-        raise TypeError(
-            '`margins` must be a square matrix with diagonal symmetry '
-            'and zero diagonal entries. `margins` represents a '
-            'directed graph as a square matrix, where `margins[i, j]` '
-            'represents the signed margin of victory (positive) or '
-            'defeat (negative) of candidate `i` against `j`. The '
-            'reverse election (candidate `j` against `i`) is '
-            'represented by `margins[j, i]` and should be equal to '
-            '`-margins[i, j]`. Additionally, the election of candidate '
-            '`i` against itself should have zero margin (i.e. '
-            '`margins[i, i] == 0`). As all preferences are compared to '
-            'each other, this matrix should include weights (margins) '
-            'between any two candidates (zero if tied).\n\n'
-
-            'The current `margins` matrix does not satisfy one of '
-            'these properties:\n'
-            '  - 2D array\n'
-            '  - square matrix\n'
-            '  - reverse diagonal symmetry\n'
-            '  - zero diagonal\n'
+    if engine not in ('search', 'widest-path'):
+        raise ValueError(
+            f'The specified engine `{engine}` does not exist! Options '
+            'are: `search` and `widest-path`.'
+        )
+
+    if cache is not None:
+        return _cached_winners(cache, margins, candidates, engine, lambda: \
+            splitcycle(
+                margins, candidates, dfs, engine, executor, stats=stats,
+                fast_path=fast_path,
+            )
         )
 
+    record = stats if stats is None or isinstance(stats, SplitCycleStats) \
+        else SplitCycleStats()
+    phase = nullcontext if record is None else record.phase
+
+    with phase('validation'):
+        if isinstance(margins, MarginMatrix):
+            # validated at construction
+            matrix, margins = margins, margins.values
+        else:
+            matrix = None
+            if not is_margin_like(margins):
+                not_margin_like()
+
     n = margins.shape[0]  # `margins` is square
 
+    # restrict the election to its Smith set, which contains all winners
+    # (winner indices are mapped back through `smith` at the end)
+    smith = None
+    if candidates is None and fast_path and matrix is None:
+        with phase('smith_set'):
+            smith = smith_set(margins)
+        if len(smith) < n:
+            margins = margins[np.ix_(smith, smith)]
+            n = len(smith)
+        else:
+            smith = None
+
     # consider all candidates when first called
     candidates = range(n) if candidates is None else candidates
 
-    # prepare multithreading pool
-    cores = os.cpu_count()
-    candidates_per_core = n // cores
-    # distribute workload as equally as possible across available cores
-    pool_sizes = [
-        (candidates_per_core + 1) if (i < n % cores) else candidates_per_core
-        for i in range(cores)
-    ]
+    # a Condorcet winner leaves a single candidate, which either engine
+    # resolves without any path search; a `MarginMatrix` answers from its
+    # cached defeats, which every engine agrees with
+    if engine == 'widest-path' or matrix is not None:
+        winners = _widest_path_winners(
+            margins if matrix is None else matrix, candidates, phase
+        )
+    else:
+        executor = default_engine() if executor is None else executor
+        winners = executor.run(margins, candidates, dfs, record)
 
-    # initialize workload by partitioning candidate indices across cores
-    work = []
-    start = 0
-    for size in pool_sizes:
-        work.append((candidates, dfs, range(start, start + size), margins))
-        start += size
+    if smith is not None:
+        winners = [smith[i] for i in winners]
 
-    # start multithreading
-    with Pool(cores) as executor:
-        result = executor.map(is_splitcycle_winner, work)
+    if record is not None:
+        record.calls += 1
+        if record is not stats:
+            stats(record)
 
-    # gather results
-    winners = set.union(*result)
+    return winners
 
-    return sorted(winners)
 
+def splitcycle_batch(margins):
+    '''
+    Determine the SplitCycle winners of many elections at once
 
-def margins_from_ballots(ballots):
+    `margins`:
+        a 3D array of shape `(n_elections, n, n)` stacking one margins
+        matrix (as described in `splitcycle`) per election; all
+        elections must have the same number of candidates
+
+    Every election is resolved with the `widest-path` engine of
+    `splitcycle`, vectorized across the whole stack, so no Python code
+    runs per election and no worker pool is started.
+
+    Returns a boolean array `winners` of shape `(n_elections, n)` where
+    `winners[e, i]` is set if and only if candidate `i` is a SplitCycle
+    winner of election `e`; the sorted winner list of election `e` is
+    `np.flatnonzero(winners[e]).tolist()`
     '''
-    Turn a set of ballots (as described in `elect`) into a voting
-    margins matrix (as described in `splitcycle`)
+    margins = np.asarray(margins)
+    if not (
+        margins.ndim == 3
+        and margins.shape[1] == margins.shape[2]
+        and np.allclose(margins, -np.swapaxes(margins, 1, 2))
+        and np.allclose(np.diagonal(margins, axis1=1, axis2=2), 0)
+    ):
+        not_margin_like()
+
+    # a candidate wins if nobody defeats it
+    return ~defeat_matrix(margins).any(axis=1)
+
+
+def default_chunk_size(n_candidates):
     '''
-    # generate initial margins matrix
-    n_candidates = ballots.shape[1]
-    margins = np.zeros((n_candidates, n_candidates))
+    Number of ballots to compare at once so that the pairwise rank
+    comparisons of a chunk (`chunk_size * n_candidates ** 2` booleans)
+    stay within `CHUNK_BYTES` of memory
+    '''
+    return max(1, CHUNK_BYTES // max(1, n_candidates ** 2))
+
+
+def pairwise_wins(ballots, chunk_size=None):
+    '''
+    Count, for every pair of candidates `i, j`, the number of `ballots`
+    (as described in `elect`, a `Profile` or `TopKBallots`) that rank
+    `i` strictly above `j`
 
-    for ballot in ballots:
-        # update all margins for this ballot
-        for i in range(n_candidates):
-            for j in range(n_candidates):
-                if i == j:
-                    # margins already has zero diagonal
-                    continue
+    `chunk_size=None`:
+        number of ballots (or distinct rankings of a `Profile`) compared
+        at once; if `None`, use `default_chunk_size`
 
-                # handle ranking possibilities except ties (do nothing)
-                if ballot[i] < ballot[j]:
-                    # i beats j
-                    margins[i, j] += 1
-                elif ballot[i] > ballot[j]:
-                    # i loses to j
-                    margins[i, j] -= 1
+    Returns an integer matrix `wins` with `wins[i, j]` the number of
+    ballots preferring `i` to `j`
+    '''
+    if isinstance(ballots, TopKBallots):
+        return ballots.pairwise_wins(chunk_size)
+
+    if isinstance(ballots, Profile):
+        # compare each distinct ranking once, weighted by its count
+        ballots, counts = ballots.rankings, ballots.counts
+    else:
+        ballots, counts = np.asarray(ballots), None
 
-    return margins
+    n_candidates = ballots.shape[1]
+    if chunk_size is None:
+        chunk_size = default_chunk_size(n_candidates)
+
+    wins = np.zeros((n_candidates, n_candidates), dtype=np.int64)
+    for start in range(0, ballots.shape[0], chunk_size):
+        chunk = ballots[start:start + chunk_size]
+        # `prefers[b, i, j]` compares rank of `i` against rank of `j` on
+        # ballot `b`; lower ranks are preferred and ties count for
+        # neither candidate
+        prefers = chunk[:, :, np.newaxis] < chunk[:, np.newaxis, :]
+        if counts is None:
+            wins += np.count_nonzero(prefers, axis=0)
+        else:
+            wins += np.tensordot(
+                counts[start:start + chunk_size], prefers, axes=1
+            )
+
+    return wins
+
+
+def margins_from_ballots(ballots, chunk_size=None):
+    '''
+    Turn a set of ballots (as described in `elect`, a `Profile` or
+    `TopKBallots`) into a voting margins matrix (as described in
+    `splitcycle`)
+
+    `chunk_size=None`:
+        number of ballots compared at once (bounds memory use to about
+        `chunk_size * n_candidates ** 2` bytes); if `None`, use
+        `default_chunk_size`
+    '''
+    wins = pairwise_wins(ballots, chunk_size)
 
+    # i beats j on `wins[i, j]` ballots and loses on `wins[j, i]`
+    return (wins - wins.T).astype(float)
 
-def elect(ballots, candidates, dfs=True):
+
+def elect(ballots, candidates, dfs=True, chunk_size=None, **options):
     '''
     Determine the SplitCycle winners given a set of `ballots` and
     `candidates`
@@ -287,6 +963,9 @@ def elect(ballots, candidates, dfs=True):
         ...     [1, 1, 1, 2],  # candidates A, B, and C tied, D unranked
         ... ])
 
+        A `Profile` of distinct ballots with counts, or sparse
+        `TopKBallots`, may be given instead
+
     `candidates`:
         a list of candidate names, where the index of each name
         corresponds to the index of the candidate in each ballot
@@ -295,6 +974,14 @@ def elect(ballots, candidates, dfs=True):
         if `True`, use depth-first search to determine the SplitCycle
         winners; if `False`, use breadth-first search
 
+    `chunk_size=None`:
+        number of ballots compared at once when building margins (see
+        `margins_from_ballots`)
+
+    `**options`:
+        further keyword arguments passed to `splitcycle` (e.g. `engine`
+        or `executor`)
+
     Returns a sorted list of all SplitCycle winners
     '''
     # check that all candidates are represented in `ballots`
@@ -302,8 +989,8 @@ def elect(ballots, candidates, dfs=True):
         not_enough_candidates()
 
     # run `splitcycle`
-    margins = margins_from_ballots(ballots)
-    winner_indices = splitcycle(margins, dfs=dfs)
+    margins = margins_from_ballots(ballots, chunk_size)
+    winner_indices = splitcycle(margins, dfs=dfs, **options)
 
     # map winner indices to candidate names
     return [candidates[i] for i in winner_indices]
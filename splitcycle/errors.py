@@ -1,5 +1,30 @@
 '''Macros for common error messages'''
 
+def not_margin_like():
+    '''Raised when a matrix cannot be used as a voting margins matrix'''
+    raise TypeError(
+        '`margins` must be a square matrix with diagonal symmetry '
+        'and zero diagonal entries. `margins` represents a '
+        'directed graph as a square matrix, where `margins[i, j]` '
+        'represents the signed margin of victory (positive) or '
+        'defeat (negative) of candidate `i` against `j`. The '
+        'reverse election (candidate `j` against `i`) is '
+        'represented by `margins[j, i]` and should be equal to '
+        '`-margins[i, j]`. Additionally, the election of candidate '
+        '`i` against itself should have zero margin (i.e. '
+        '`margins[i, i] == 0`). As all preferences are compared to '
+        'each other, this matrix should include weights (margins) '
+        'between any two candidates (zero if tied).\n\n'
+
+        'The current `margins` matrix does not satisfy one of '
+        'these properties:\n'
+        '  - 2D array\n'
+        '  - square matrix\n'
+        '  - reverse diagonal symmetry\n'
+        '  - zero diagonal\n'
+    )
+
+
 def not_enough_candidates():
     '''Raised when candidates do not align with ballots'''
     raise ValueError(
@@ -7,3 +32,20 @@ def not_enough_candidates():
         'candidates in `candidates` (i.e. some ranked candidates '
         'could not be matched with names from provided data)'
     )
+
+
+def mismatched_tallies():
+    '''Raised when combining tallies over different candidates'''
+    raise ValueError(
+        'Cannot combine tallies with different numbers of candidates '
+        '(i.e. the partial tallies were not counted over the same '
+        'election)'
+    )
+
+
+def non_integer_margins():
+    '''Raised when margins that should count ballots are not integers'''
+    raise ValueError(
+        '`margins` must have integer entries (differences in numbers of '
+        'ballots) to be stored as a `MarginMatrix`'
+    )
@@ -0,0 +1,352 @@
+'''
+Large-candidate mode for SplitCycle, for elections with thousands to
+tens of thousands of candidates (e.g. participatory budgeting)
+
+Margins are stored as compact integers, either densely or as the upper
+triangle only (`TriangularMargins`, since `margins[j, i] ==
+-margins[i, j]`). `splitcycle_large` first splits the majority graph
+(edges of positive margin) into strongly connected components: a
+candidate beaten by a candidate of another component is defeated
+outright, since no positive path leads back. Remaining candidates are
+only searched within their component, with iterative, vectorized
+breadth-first searches that never recurse.
+
+Memory ceiling: the margins themselves (`n * n * itemsize` bytes dense,
+or `n * (n - 1) / 2 * itemsize` bytes triangular, where `itemsize` is
+2 bytes for fewer than 32768 ballots), plus at most `row_bytes` for rows
+of margins gathered at once, plus a few arrays of `n` entries. For
+20,000 candidates and 16-bit margins this is about 400 MB triangular
+with the default `ROW_BYTES`.
+
+Time: the decomposition reads `O(n^2 log n)` margins in expectation
+(see `components`), and marking candidates beaten from other components
+reads every margin once. Each remaining candidate of a component of `c`
+candidates then runs one search of at most `c^2` margin reads per
+candidate beating it, until one of them finds a defeat.
+'''
+
+import numpy as np
+from .core import default_chunk_size, is_margin_like
+from .errors import not_margin_like
+
+# memory budget (in bytes) for rows of margins gathered at once
+ROW_BYTES = 1 << 26
+
+
+def margin_dtype(bound):
+    '''
+    Smallest signed integer dtype that can hold margins up to `bound` in
+    absolute value (e.g. the number of ballots)
+    '''
+    for dtype in (np.int16, np.int32):
+        if bound <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    return np.dtype(np.int64)
+
+
+def _tally_rows(ballots, start, stop, chunk_size):
+    '''
+    Return the rows `start` to `stop` of the margins matrix of `ballots`,
+    comparing `chunk_size` ballots at a time
+    '''
+    tally = np.zeros((stop - start, ballots.shape[1]), dtype=np.int64)
+    for first in range(0, ballots.shape[0], chunk_size):
+        chunk = ballots[first:first + chunk_size]
+        ranks = chunk[:, start:stop, np.newaxis]
+        others = chunk[:, np.newaxis, :]
+        tally += np.count_nonzero(ranks < others, axis=0)
+        tally -= np.count_nonzero(ranks > others, axis=0)
+
+    return tally
+
+
+class TriangularMargins:
+    '''
+    Voting margins matrix (as described in `splitcycle`) stored as its
+    strict upper triangle, in row-major order, with a compact integer
+    dtype; uses half the memory of the dense matrix
+
+    Rows of the full matrix are reconstructed on demand with `rows`.
+    '''
+
+    __slots__ = ('n', 'values')
+
+    def __init__(self, n, values):
+        '''
+        `n`:
+            the number of candidates
+
+        `values`:
+            the `n * (n - 1) // 2` margins `margins[i, j]` with `i < j`,
+            in row-major order
+        '''
+        self.n = n
+        self.values = np.asarray(values)
+        if self.values.shape != (n * (n - 1) // 2,):
+            raise ValueError(
+                f'`values` must hold the {n * (n - 1) // 2} upper '
+                f'triangular margins of {n} candidates'
+            )
+
+    @classmethod
+    def from_dense(cls, margins, dtype=None):
+        '''
+        Compact a square `margins` matrix
+
+        `dtype=None`:
+            integer dtype to store margins in; if `None`, the smallest
+            that fits (see `margin_dtype`)
+        '''
+        margins = np.asarray(margins)
+        if not is_margin_like(margins):
+            not_margin_like()
+
+        n = margins.shape[0]
+        if dtype is None:
+            dtype = margin_dtype(np.abs(margins).max(initial=0))
+
+        return cls(n, margins[np.triu_indices(n, 1)].astype(dtype))
+
+    @classmethod
+    def from_ballots(cls, ballots, chunk_size=None, row_bytes=ROW_BYTES):
+        '''
+        Tally a 2D array of `ballots` (as described in `elect`, e.g. a
+        memory-mapped ballot file) directly into triangular storage,
+        without ever building the dense matrix
+
+        `chunk_size=None`:
+            number of ballots compared at once (see
+            `margins_from_ballots`)
+
+        `row_bytes=ROW_BYTES`:
+            memory budget for the block of margin rows tallied at once
+        '''
+        ballots = np.asarray(ballots)
+        n_ballots, n = ballots.shape
+        values = np.empty(n * (n - 1) // 2, dtype=margin_dtype(n_ballots))
+
+        # tally a block of rows at a time against every candidate
+        block = max(1, row_bytes // (8 * n))
+        chunk_size = chunk_size or max(1, default_chunk_size(n) * n // block)
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            tally = _tally_rows(ballots, start, stop, chunk_size)
+            for i in range(start, stop):
+                offset = i * n - i * (i + 1) // 2
+                values[offset:offset + n - i - 1] = tally[i - start, i + 1:]
+
+        return cls(n, values)
+
+    @property
+    def shape(self):
+        '''Shape of the full margins matrix'''
+        return (self.n, self.n)
+
+    def rows(self, indices, columns=None):
+        '''
+        Return the rows `margins[indices, :]` of the full matrix as a 2D
+        array, or only their `columns` (an array of candidate indices)
+        '''
+        i = np.asarray(indices)[:, np.newaxis]
+        if columns is None:
+            columns = np.arange(self.n)
+        j = np.asarray(columns)[np.newaxis, :]
+        if not self.values.size:
+            # a single candidate has only the zero diagonal
+            return np.zeros((i.shape[0], j.shape[1]), dtype=self.values.dtype)
+
+        low, high = np.minimum(i, j), np.maximum(i, j)
+
+        # position of `margins[low, high]` in `values` (clipped on the
+        # diagonal, which is zero)
+        position = low * self.n - low * (low + 1) // 2 + high - low - 1
+        values = self.values[np.maximum(position, 0)]
+
+        return np.where(i < j, values, np.where(i > j, -values, 0))
+
+    def to_dense(self):
+        '''Return the full margins matrix'''
+        return self.rows(np.arange(self.n))
+
+
+def _row_reader(margins, row_bytes):
+    '''
+    Return the number of candidates in `margins` (dense or
+    `TriangularMargins`) and a function `read(indices, columns)` that
+    yields `margins[indices, :][:, columns]` in blocks of rows using at
+    most about `row_bytes` of memory each
+    '''
+    if isinstance(margins, TriangularMargins):
+        n, rows = margins.n, margins.rows
+    else:
+        margins = np.asarray(margins)
+        if not is_margin_like(margins):
+            not_margin_like()
+
+        n = margins.shape[0]
+        margins = margins.astype(margin_dtype(np.abs(margins).max(initial=0)))
+
+        def rows(indices, columns):
+            return margins[np.ix_(indices, columns)]
+
+    return n, _blocked(rows, row_bytes)
+
+
+def _blocked(rows, row_bytes):
+    '''
+    Wrap `rows(indices, columns)` into a generator function that gathers
+    at most about `row_bytes` of memory at a time
+    '''
+    def read(indices, columns):
+        # gathered rows cost an index and a value per entry
+        block = max(1, row_bytes // (16 * max(1, len(columns))))
+        for start in range(0, len(indices), block):
+            yield rows(indices[start:start + block], columns)
+
+    return read
+
+
+def _search(read, source, nodes, k, target=None):
+    '''
+    Iterative breadth-first search from `source` within the sorted
+    candidate indices `nodes`, along edges of margin at least `k` (or
+    edges into the candidate of margin at least `-k` if `k < 0`),
+    reading margins with `read` (see `_row_reader`)
+
+    Stops early once the local index `target` (an index into `nodes`)
+    is reached
+
+    Returns a boolean mask over `nodes` of the candidates reached
+    '''
+    reached = np.zeros(len(nodes), dtype=bool)
+    reached[np.searchsorted(nodes, source)] = True
+    frontier = np.array([source])
+    strong = np.greater_equal if k > 0 else np.less_equal
+
+    while frontier.size:
+        hits = np.zeros(len(nodes), dtype=bool)
+        for weights in read(frontier, nodes):
+            hits |= strong(weights, k).any(axis=0)
+
+        new = hits & ~reached
+        reached |= new
+        if target is not None and reached[target]:
+            break
+        frontier = nodes[new]
+
+    return reached
+
+
+def components(margins, row_bytes=ROW_BYTES):
+    '''
+    Label the strongly connected components of the majority graph of
+    `margins` (dense or `TriangularMargins`), in which each candidate
+    points to every candidate it has a positive margin over
+
+    Uses forward-backward decomposition: the candidates both reachable
+    from and reaching a pivot form its component, and every other
+    component lies entirely among the candidates reachable only one
+    way, or neither way. Pivots are drawn at random, so that (as in
+    quicksort) no order of the candidates makes the decomposition peel
+    off one candidate per round: it reads `O(n^2 log n)` margins in
+    expectation.
+
+    Returns an integer array giving the component of each candidate
+    '''
+    n, read = _row_reader(margins, row_bytes)
+    rng = np.random.default_rng(0)  # labels do not depend on the pivots
+
+    labels = np.full(n, -1)
+    pending = [np.arange(n)]
+    while pending:
+        nodes = pending.pop()
+        if not nodes.size:
+            continue
+
+        pivot = nodes[rng.integers(nodes.size)]
+        forward = _search(read, pivot, nodes, 1)
+        backward = _search(read, pivot, nodes, -1)
+        labels[nodes[forward & backward]] = labels.max() + 1
+
+        pending.extend([
+            nodes[forward & ~backward],
+            nodes[backward & ~forward],
+            nodes[~forward & ~backward],
+        ])
+
+    return labels
+
+
+def splitcycle_large(margins, row_bytes=ROW_BYTES):
+    '''
+    Determine the SplitCycle winners of an election with many
+    candidates (see module documentation)
+
+    `margins`:
+        a margins matrix (as described in `splitcycle`), or
+        `TriangularMargins`
+
+    `row_bytes=ROW_BYTES`:
+        memory budget for rows of margins gathered at once
+
+    Returns a sorted list of all SplitCycle winners
+    '''
+    n, read = _row_reader(margins, row_bytes)
+    labels = components(margins, row_bytes)
+
+    # no positive path leads back to a candidate beaten from another
+    # component
+    beaten = np.zeros(n, dtype=bool)
+    everyone = np.arange(n)
+    start = 0
+    for weights in read(everyone, everyone):
+        stop = start + weights.shape[0]
+        outside = labels[start:stop, np.newaxis] != labels[np.newaxis, :]
+        beaten |= ((weights > 0) & outside).any(axis=0)
+        start = stop
+
+    winners = []
+    for label in np.unique(labels[~beaten]):
+        nodes = np.flatnonzero(labels == label)
+        winners.extend(_component_winners(read, nodes, beaten, row_bytes))
+
+    return sorted(winners)
+
+
+def _component_winners(read, nodes, beaten, row_bytes):
+    '''
+    Return the SplitCycle winners among the candidates `nodes` of a
+    strongly connected component, skipping those already `beaten` from
+    outside it
+    '''
+    local = np.arange(len(nodes))
+    itemsize = next(read(nodes[:1], nodes[:1])).itemsize
+    if len(nodes) ** 2 * itemsize <= row_bytes:
+        # the whole component fits in the budget: gather it only once
+        block = np.concatenate(list(read(nodes, nodes)))
+
+        def rows(indices, columns):
+            if len(columns) == len(nodes):
+                # searches span the whole component
+                return block[indices]
+            return block[np.ix_(indices, columns)]
+    else:
+        def rows(indices, columns):
+            return np.concatenate(list(read(nodes[indices], nodes[columns])))
+
+    local_read = _blocked(rows, row_bytes)
+
+    winners = []
+    for a in local[~beaten[nodes]]:
+        row = next(local_read(local[a:a + 1], local))[0]
+        beaters = np.flatnonzero(row < 0)
+
+        # try the strongest defeats first, as they have the fewest paths
+        for b in beaters[np.argsort(row[beaters])]:
+            if not _search(local_read, a, local, -row[b], b)[b]:
+                break
+        else:
+            winners.append(nodes[a])
+
+    return winners
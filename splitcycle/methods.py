@@ -0,0 +1,130 @@
+'''
+Other voting methods on the same margins machinery as `splitcycle`, for
+comparisons and audits
+
+Beat Path (Schulze) and Split Cycle are both decided by the strongest
+path matrix of the margins graph (see `core.strongest_paths`), so
+`compare_methods` computes it once and derives every method's winners
+from it:
+
+>>> compare_methods(margins)
+{'splitcycle': [0, 2], 'beat_path': [0], 'copeland': [0]}
+'''
+
+import numpy as np
+from .core import MarginMatrix, defeat_matrix, is_margin_like, \
+    strongest_paths
+from .errors import not_margin_like
+
+# methods known to `compare_methods`, in the order they are reported
+METHODS = ('splitcycle', 'beat_path', 'copeland')
+
+
+def _validated(margins):
+    '''
+    Return the values of `margins` (a matrix or `MarginMatrix`) and its
+    strongest path matrix, computed only on demand
+    '''
+    if isinstance(margins, MarginMatrix):
+        return margins.values, lambda: margins.strengths
+
+    margins = np.asarray(margins)
+    if not is_margin_like(margins):
+        not_margin_like()
+
+    strengths = []
+
+    def cached():
+        if not strengths:
+            strengths.append(strongest_paths(margins))
+        return strengths[0]
+
+    return margins, cached
+
+
+def beat_path_winners(margins, strengths=None):
+    '''
+    Return a sorted list of the Beat Path (Schulze) winners of a
+    validated `margins` matrix: the candidates `x` whose strongest path
+    to every `y` is at least as strong as the strongest path back
+
+    `strengths=None`:
+        strongest path matrix of `margins` (see `strongest_paths`); if
+        `None`, it is computed
+    '''
+    if strengths is None:
+        strengths = strongest_paths(margins)
+
+    # paths through a non-positive margin are no paths at all
+    strengths = np.maximum(strengths, 0)
+
+    return np.flatnonzero((strengths >= strengths.T).all(axis=1)).tolist()
+
+
+def copeland_winners(margins):
+    '''
+    Return a sorted list of the Copeland winners of a validated
+    `margins` matrix: the candidates with the most pairwise wins minus
+    pairwise losses
+    '''
+    scores = np.sign(margins).sum(axis=1)
+    if not scores.size:
+        return []
+
+    return np.flatnonzero(scores == scores.max()).tolist()
+
+
+def beat_path(margins):
+    '''
+    Return a sorted list of the Beat Path (Schulze) winners of `margins`
+    (as described in `splitcycle`, or a `MarginMatrix`)
+    '''
+    margins, strengths = _validated(margins)
+    return beat_path_winners(margins, strengths())
+
+
+def copeland(margins):
+    '''
+    Return a sorted list of the Copeland winners of `margins` (as
+    described in `splitcycle`, or a `MarginMatrix`)
+    '''
+    margins, _ = _validated(margins)
+    return copeland_winners(margins)
+
+
+def compare_methods(margins, methods=METHODS):
+    '''
+    Determine the winners of one election under several voting methods,
+    computing the strongest path matrix they share only once
+
+    `margins`:
+        a margins matrix (as described in `splitcycle`), or a
+        `MarginMatrix` whose cached structures are reused
+
+    `methods=METHODS`:
+        names of the methods to run, out of `METHODS`
+
+    Returns a dictionary mapping each method to its sorted list of
+    winners
+    '''
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        raise ValueError(
+            f'Unknown methods {sorted(unknown)}! Options are: '
+            f'{", ".join(METHODS)}.'
+        )
+
+    matrix = margins
+    margins, strengths = _validated(margins)
+    winners = {}
+    for method in methods:
+        if method == 'splitcycle':
+            defeats = matrix.defeats if isinstance(matrix, MarginMatrix) \
+                else defeat_matrix(margins, strengths())
+            winners[method] = np.flatnonzero(~defeats.any(axis=0)).tolist()
+        elif method == 'beat_path':
+            winners[method] = beat_path_winners(margins, strengths())
+        else:
+            winners[method] = copeland_winners(margins)
+
+    return winners
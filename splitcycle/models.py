@@ -1,10 +1,64 @@
 '''Voting model representations used in user-facing utilities'''
 
-from random import randint
+from itertools import permutations
+from math import factorial
 import numpy as np
+from .core import pairwise_wins
+from .profiles import Profile
+from .storage import rank_dtype
 
+# largest number of rankings enumerated when sampling margins directly
+MAX_RANKINGS = factorial(8)
 
-def ic(n_ballots, n_candidates, ties):
+# number of ballots generated at once when sampling margins in chunks
+SAMPLE_CHUNK = 1 << 16
+
+
+def _ranks(orders):
+    '''
+    Turn `orders` (candidate indices from most to least preferred, one
+    voter per row) into ballots with ranks 1 to `n_candidates`
+    '''
+    n_candidates = orders.shape[1]
+    ballots = np.empty(orders.shape, dtype=rank_dtype(n_candidates))
+    np.put_along_axis(
+        ballots, orders, np.arange(1, n_candidates + 1)[np.newaxis, :], axis=1
+    )
+
+    return ballots
+
+
+def _random_orders(rng, n_ballots, n_candidates):
+    '''Draw `n_ballots` uniformly random strict orders of the candidates'''
+    return np.argsort(rng.random((n_ballots, n_candidates)), axis=1)
+
+
+def _all_rankings(n_candidates):
+    '''Return every strict ranking of the candidates as ballots'''
+    return _ranks(np.array(list(permutations(range(n_candidates)))))
+
+
+def _ic_sampler(n_candidates, ties, rng):
+    '''
+    Return a function drawing ballots under the impartial culture model,
+    and a function giving the probability of each strict ranking (or
+    `None` if the model has ties)
+    '''
+    def sample(n_ballots):
+        if ties:
+            return rng.integers(
+                1, n_candidates, size=(n_ballots, n_candidates),
+                endpoint=True, dtype=rank_dtype(n_candidates),
+            )
+        return _ranks(_random_orders(rng, n_ballots, n_candidates))
+
+    def probabilities(rankings):
+        return np.full(len(rankings), 1 / len(rankings))
+
+    return sample, None if ties else probabilities
+
+
+def ic(n_ballots, n_candidates, ties, rng=None):
     '''
     Generate a random set of ballots according to the impartial culture
     model, with a parameter to specify whether there should be ties.
@@ -18,28 +72,40 @@ def ic(n_ballots, n_candidates, ties):
     `ties`:
         whether to allow ties in the election
 
+    `rng=None`:
+        seed or `np.random.Generator` to draw from
+
     Return a numpy array of shape (n_ballots, n_candidates) that
     represents a preprocessed list of ballots with ranks 1 to
-    `n_candidates` (can be used with `elect`)
+    `n_candidates` (can be used with `elect`), stored with the smallest
+    suitable integer dtype (see `rank_dtype`)
     '''
-    # generate random ballots
-    ballots = np.zeros((n_ballots, n_candidates))
-    for i in range(n_ballots):
-        if ties:
-            ballots[i] = np.array(
-                [randint(1, n_candidates) for _ in range(n_candidates)]
-            )
-        else:
-            # generate `n_candidates` unique random integers
-            # from 1 to `n_candidates`
-            ballots[i] = 1 + np.random.choice(
-                n_candidates, n_candidates, replace=False
-            )
+    sample, _ = _ic_sampler(n_candidates, ties, np.random.default_rng(rng))
+    return sample(n_ballots)
 
-    return ballots
+
+def _euclidean_sampler(n_candidates, n, rng):
+    '''
+    Draw candidate points for the euclidean model in `n` dimensions and
+    return a function drawing ballots of voters placed at random
+    '''
+    # generate random candidate points
+    candidates = rng.uniform(-1, 1, (n_candidates, n))
+
+    def sample(n_ballots):
+        # generate random voter points
+        voters = rng.uniform(-1, 1, (n_ballots, n))
+
+        # rank candidates by distance to each voter
+        distances = np.linalg.norm(
+            voters[:, np.newaxis, :] - candidates[np.newaxis, :, :], axis=2
+        )
+        return _ranks(np.argsort(distances, axis=1))
+
+    return sample, None
 
 
-def euclidean(n_ballots, n_candidates, n):
+def euclidean(n_ballots, n_candidates, n, rng=None):
     '''
     Generate a random set of ballots according to the euclidean
     (spatial) model in `n` dimensions.
@@ -53,20 +119,262 @@ def euclidean(n_ballots, n_candidates, n):
     `n`:
         dimensionality of the voter preferences space
 
+    `rng=None`:
+        seed or `np.random.Generator` to draw from
+
     Return a numpy array of shape (n_ballots, n_candidates) that
     represents a preprocessed list of ballots with ranks 1 to
-    `n_candidates` (can be used with `elect`)
+    `n_candidates` (can be used with `elect`), stored with the smallest
+    suitable integer dtype (see `rank_dtype`)
     '''
-    # generate random candidate points
-    candidates = np.random.uniform(-1, 1, (n_candidates, n))
+    sample, _ = _euclidean_sampler(n_candidates, n, np.random.default_rng(rng))
+    return sample(n_ballots)
+
 
-    # generate random voter points
-    voters = np.random.uniform(-1, 1, (n_ballots, n))
+def _urn_rate(n_candidates, replace, rng):
+    '''
+    Number of balls added per draw in the urn model (see `urn`) relative
+    to the number of rankings, drawing it for `URN-R` if `replace` is
+    `None`
+    '''
+    if replace is None:
+        return rng.gamma(0.8)
+    return replace / factorial(n_candidates)
 
-    # compute voter preferences
-    ballots = np.zeros((n_ballots, n_candidates))
-    for i in range(n_ballots):
-        distances = np.linalg.norm(candidates - voters[i], axis=1)
-        ballots[i] = 1 + np.argsort(distances)
 
-    return ballots
+def _urn_profile(n_ballots, n_candidates, rate, rng):
+    '''
+    Draw a `Profile` from the Polya-Eggenberger urn model (see `urn`),
+    along with the index of each voter's ranking in it
+
+    Drawing from an urn holding one ball per ranking, to which `rate`
+    times as many copies of every drawn ball are added, is a Chinese
+    restaurant process: voter `i` draws a fresh uniformly random ranking
+    with probability `1 / (1 + rate * i)`, and otherwise copies the
+    ranking of a uniformly chosen earlier voter. Only the fresh rankings
+    are generated; every other voter just points to an earlier voter.
+    '''
+    voters = np.arange(n_ballots)
+
+    fresh = rng.random(n_ballots) * (1 + rate * voters) < 1
+    source = np.where(
+        fresh, voters, (rng.random(n_ballots) * voters).astype(np.intp)
+    )
+
+    # follow copies back to the voter who drew the ranking fresh
+    while not np.array_equal(source[source], source):
+        source = source[source]
+
+    _, inverse, counts = np.unique(
+        source, return_inverse=True, return_counts=True
+    )
+    rankings = _ranks(_random_orders(rng, len(counts), n_candidates))
+
+    return Profile(rankings, counts), inverse
+
+
+def urn(n_ballots, n_candidates, replace=None, rng=None):
+    '''
+    Generate a random set of ballots according to the Polya-Eggenberger
+    urn model: the urn starts with one ball per strict ranking, each
+    voter draws a ball, and `replace` copies of the drawn ball are added
+
+    `replace=None`:
+        number of copies added per draw; if `None`, use a random
+        multiple of the number of rankings drawn from a Gamma(0.8)
+        distribution (as in the `URN-R` model of the appendix notebooks)
+
+    `rng=None`:
+        seed or `np.random.Generator` to draw from
+
+    Return a numpy array of shape (n_ballots, n_candidates) of ballots
+    with ranks 1 to `n_candidates` (can be used with `elect`)
+    '''
+    rng = np.random.default_rng(rng)
+    rate = _urn_rate(n_candidates, replace, rng)
+
+    profile, inverse = _urn_profile(n_ballots, n_candidates, rate, rng)
+    return profile.rankings[inverse]
+
+
+def iac(n_ballots, n_candidates, rng=None):
+    '''
+    Generate a random set of ballots according to the impartial
+    anonymous culture model, under which every anonymous profile is
+    equally likely (equivalent to `urn` with `replace=1`)
+
+    Return a numpy array of shape (n_ballots, n_candidates) of ballots
+    with ranks 1 to `n_candidates` (can be used with `elect`)
+    '''
+    return urn(n_ballots, n_candidates, 1, rng)
+
+
+def phi_from_relphi(n_candidates, relphi):
+    '''
+    Find the Mallows dispersion `phi` whose expected swap (Kendall tau)
+    distance from the reference ranking is `relphi` times the
+    `n_candidates * (n_candidates - 1) / 4` expected distance of a
+    uniformly random ranking (the normalized Mallows model of Boehmer
+    et al.)
+    '''
+    def expected_distance(phi):
+        # the `j`th inserted candidate is displaced `v < j` places with
+        # probability proportional to `phi ** v`
+        total = 0
+        for j in range(1, n_candidates + 1):
+            weights = phi ** np.arange(j)
+            total += np.arange(j) @ weights / weights.sum()
+        return total
+
+    target = relphi * n_candidates * (n_candidates - 1) / 4
+    low, high = 0, 1
+    for _ in range(50):
+        mid = (low + high) / 2
+        if expected_distance(mid) < target:
+            low = mid
+        else:
+            high = mid
+
+    return (low + high) / 2
+
+
+def _kendall_distances(rankings, reference):
+    '''
+    Number of candidate pairs each of `rankings` orders unlike
+    `reference`
+    '''
+    ahead = rankings[:, :, np.newaxis] < rankings[:, np.newaxis, :]
+    return np.count_nonzero(
+        ahead & (reference[:, np.newaxis] > reference[np.newaxis, :]),
+        axis=(1, 2),
+    )
+
+
+def _mallows_sampler(n_candidates, relphi, two_references, rng):
+    '''
+    Draw the parameters of the Mallows model (see `mallows`) and return
+    a function drawing ballots from it, and a function giving the
+    probability of each strict ranking
+    '''
+    if relphi is None:
+        relphi = rng.uniform(0.001, 0.999)
+    phi = phi_from_relphi(n_candidates, relphi)
+    # `reference` ranks candidate `reference_order[k]` in place `k + 1`
+    reference_order = rng.permutation(n_candidates)
+    reference = _ranks(reference_order[np.newaxis, :])[0]
+
+    def sample(n_ballots):
+        # repeated insertion: the `i`th candidate of the reference order
+        # is inserted `v` places above the bottom with probability
+        # proportional to `phi ** v`; `places[:, k]` tracks the place
+        # of the `k`th candidate among those inserted so far
+        places = np.zeros((n_ballots, n_candidates), dtype=np.intp)
+        for i in range(n_candidates):
+            weights = np.cumsum(phi ** np.arange(i + 1))
+            shift = np.searchsorted(
+                weights, rng.random(n_ballots) * weights[-1], side='right'
+            )
+            place = i - np.minimum(shift, i)
+            places[:, :i] += places[:, :i] >= place[:, np.newaxis]
+            places[:, i] = place
+
+        ballots = np.empty_like(places, dtype=rank_dtype(n_candidates))
+        ballots[:, reference_order] = places + 1
+
+        if two_references:
+            # reverse the ballots of voters following the reverse order
+            flip = rng.random(n_ballots) < 0.5
+            ballots[flip] = n_candidates + 1 - ballots[flip]
+
+        return ballots
+
+    def probabilities(rankings):
+        weights = phi ** _kendall_distances(rankings, reference)
+        if two_references:
+            weights = weights + phi ** _kendall_distances(
+                rankings, n_candidates + 1 - reference
+            )
+        return weights / weights.sum()
+
+    return sample, probabilities
+
+
+def mallows(
+        n_ballots, n_candidates, relphi=None, two_references=False, rng=None
+    ):
+    '''
+    Generate a random set of ballots according to the Mallows model:
+    voters' rankings concentrate around a random reference ranking, with
+    the probability of a ranking proportional to `phi ** d` for its swap
+    distance `d` from the reference
+
+    `relphi=None`:
+        normalized dispersion between 0 (every voter casts the
+        reference ranking) and 1 (impartial culture), see
+        `phi_from_relphi`; if `None`, drawn uniformly at random (as in
+        the `MALLOWS-RELPHI-R` model of the appendix notebooks)
+
+    `two_references=False`:
+        if `True`, each voter follows the reference ranking or its
+        reverse with equal probability (as in `MALLOWS_2REF-RELPHI-R`)
+
+    `rng=None`:
+        seed or `np.random.Generator` to draw from
+
+    Return a numpy array of shape (n_ballots, n_candidates) of ballots
+    with ranks 1 to `n_candidates` (can be used with `elect`)
+    '''
+    sample, _ = _mallows_sampler(
+        n_candidates, relphi, two_references, np.random.default_rng(rng)
+    )
+    return sample(n_ballots)
+
+
+def sample_margins(n_ballots, n_candidates, model, rng=None, **params):
+    '''
+    Sample the voting margins matrix (as described in `splitcycle`) of a
+    random election without generating one ballot per voter
+
+    `model`:
+        one of the ballot models in this module (`ic`, `euclidean`,
+        `urn`, `iac` or `mallows`), with its parameters other than
+        `n_ballots`, `n_candidates` and `rng` given as `params`
+
+    With few enough candidates (at most `MAX_RANKINGS` strict rankings),
+    `ic` without ties and `mallows` draw the number of voters casting
+    each ranking from a single multinomial distribution. `urn` and
+    `iac` only generate the distinct rankings (see `_urn_profile`).
+    Otherwise ballots are generated and tallied `SAMPLE_CHUNK` at a
+    time, so memory use does not grow with `n_ballots`.
+    '''
+    rng = np.random.default_rng(rng)
+
+    if model in (urn, iac):
+        replace = 1 if model is iac else params.get('replace')
+        rate = _urn_rate(n_candidates, replace, rng)
+        profile, _ = _urn_profile(n_ballots, n_candidates, rate, rng)
+        wins = pairwise_wins(profile)
+        return (wins - wins.T).astype(float)
+
+    samplers = {
+        ic: _ic_sampler, euclidean: _euclidean_sampler,
+        mallows: _mallows_sampler,
+    }
+    if model is mallows:
+        params = {'relphi': None, 'two_references': False} | params
+    sample, probabilities = samplers[model](
+        n_candidates, rng=rng, **params
+    )
+
+    if probabilities is not None and factorial(n_candidates) <= MAX_RANKINGS:
+        rankings = _all_rankings(n_candidates)
+        counts = rng.multinomial(n_ballots, probabilities(rankings))
+        wins = pairwise_wins(Profile(rankings, counts))
+    else:
+        wins = np.zeros((n_candidates, n_candidates), dtype=np.int64)
+        for start in range(0, n_ballots, SAMPLE_CHUNK):
+            wins += pairwise_wins(
+                sample(min(SAMPLE_CHUNK, n_ballots - start))
+            )
+
+    return (wins - wins.T).astype(float)
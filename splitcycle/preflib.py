@@ -0,0 +1,167 @@
+'''
+Readers for PrefLib (<https://www.preflib.org>) ordinal preference files
+
+Supported are complete strict orders (`.soc`), incomplete strict orders
+(`.soi`) and complete orders with ties (`.toc`) in the current PrefLib
+format, whose metadata lines start with `#`:
+
+    # DATA TYPE: toc
+    # NUMBER ALTERNATIVES: 3
+    # ALTERNATIVE NAME 1: Alice
+    ...
+    12: 1,{2,3}
+    5: 3,1
+
+as well as the legacy format (a line with the number of alternatives,
+one `index,name` line per alternative, then a `voters,sum,unique` line).
+Every order line is `count: order` (`count,order` in the legacy format)
+with alternatives numbered from 1 and ties in braces.
+
+Orders are read line by line into a `Profile` of compact ranks (see
+`storage.rank_dtype`); unranked alternatives share the rank after the
+last ranked one, as described in `elect`.
+
+Example:
+>>> profile, candidates = read_preflib('ED-00001-00000001.soi')
+>>> elect(profile, candidates)
+'''
+
+import re
+from itertools import chain
+import numpy as np
+from .profiles import Profile
+from .storage import rank_dtype
+
+# orders parsed into one block of ranks at a time
+BATCH_ORDERS = 10000
+
+_METADATA = re.compile(r'#\s*([^:]+):\s*(.*)')
+_TIED = re.compile(r'\{([^}]*)\}|(\d+)')
+_COUNT = re.compile(r'\s*[:,]\s*')
+
+
+def _tied_ranks(order, ballot):
+    '''
+    Fill `ballot` (as described in `elect`) with the ranks of a PrefLib
+    `order` string with ties, such as `1,{2,3},4`
+    '''
+    groups = _TIED.findall(order)
+    ballot.fill(len(groups) + 1)
+    for rank, (tied, single) in enumerate(groups, 1):
+        ballot[np.array((tied or single).split(','), dtype=np.int64) - 1] = rank
+
+
+def _rankings(orders, n_candidates, dtype):
+    '''
+    Return the ballots (as described in `elect`) of a list of PrefLib
+    `orders` strings, one per row
+    '''
+    rankings = np.empty((len(orders), n_candidates), dtype=dtype)
+    tied = np.array(['{' in order for order in orders], dtype=bool)
+    strict = np.flatnonzero(~tied)
+
+    # strict orders: the position of each alternative is its rank, so
+    # all of them are parsed at once
+    if strict.size:
+        joined = ','.join(orders[i] for i in strict)
+        alternatives = np.array(joined.split(','), dtype=np.int64) - 1
+        lengths = np.array([orders[i].count(',') + 1 for i in strict])
+        rows = np.repeat(strict, lengths)
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        rankings[strict] = (lengths + 1)[:, np.newaxis]
+        rankings[rows, alternatives] = np.arange(len(rows)) - starts + 1
+
+    for i in np.flatnonzero(tied):
+        _tied_ranks(orders[i], rankings[i])
+
+    return rankings
+
+
+def _read_header(lines):
+    '''
+    Consume the metadata of a PrefLib file from the iterator of stripped
+    `lines`
+
+    Returns the number of alternatives, their names by number, and the
+    first order line (or `None`)
+    '''
+    first = next(lines, '')
+    if not first.startswith('#'):
+        # legacy format: alternatives, names, then voter totals
+        n_candidates = int(first)
+        names = {}
+        for _ in range(n_candidates):
+            number, name = next(lines).split(',', 1)
+            names[int(number)] = name
+        next(lines)
+        return n_candidates, names, next(lines, None)
+
+    metadata, names = {}, {}
+    line = first
+    while line is not None and (line.startswith('#') or not line):
+        if match := _METADATA.match(line):
+            key, value = match[1].strip().upper(), match[2].strip()
+            if key.startswith('ALTERNATIVE NAME'):
+                names[int(key.split()[-1])] = value
+            else:
+                metadata[key] = value
+        line = next(lines, None)
+
+    if 'NUMBER ALTERNATIVES' not in metadata:
+        raise ValueError('missing `NUMBER ALTERNATIVES` in PrefLib header')
+
+    return int(metadata['NUMBER ALTERNATIVES']), names, line
+
+
+def _batches(lines, n_candidates, batch_orders):
+    '''
+    Yield the order `lines` of a PrefLib file as `Profile`s of at most
+    `batch_orders` rankings each
+    '''
+    dtype = rank_dtype(n_candidates)
+    counts, orders = [], []
+    for line in chain(lines, [None]):
+        if line is not None:
+            if not line or line.startswith('#'):
+                continue
+
+            # `count: order` (current format) or `count,order` (legacy)
+            count, order = _COUNT.split(line, maxsplit=1)
+            counts.append(int(count))
+            orders.append(order.replace(' ', ''))
+
+        if orders and (line is None or len(orders) == batch_orders):
+            yield Profile(_rankings(orders, n_candidates, dtype), counts)
+            counts, orders = [], []
+
+
+def read_preflib(path, batch_orders=BATCH_ORDERS):
+    '''
+    Read the PrefLib `.soc`, `.soi` or `.toc` file at `path` (or an open
+    text file), parsing `batch_orders` order lines at a time
+
+    Returns a `Profile` of its distinct ballots (as described in
+    `elect`) and the list of candidate names
+    '''
+    # pylint: disable-next=consider-using-with
+    file = path if hasattr(path, 'read') else open(path, encoding='utf-8')
+    try:
+        lines = (line.strip() for line in file)
+        n_candidates, names, first = _read_header(lines)
+        if first is not None:
+            lines = chain([first], lines)
+
+        profiles = list(_batches(lines, n_candidates, batch_orders))
+    finally:
+        if file is not path:
+            file.close()
+
+    candidates = [names.get(i, str(i)) for i in range(1, n_candidates + 1)]
+    if not profiles:
+        empty = np.empty((0, n_candidates), dtype=rank_dtype(n_candidates))
+        return Profile(empty, []), candidates
+
+    return Profile.from_ballots(
+        np.concatenate([profile.rankings for profile in profiles]),
+        np.concatenate([profile.counts for profile in profiles]),
+    ), candidates
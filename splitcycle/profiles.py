@@ -0,0 +1,277 @@
+'''Compact representations of sets of ballots'''
+
+import numpy as np
+
+# number of ranked pairs of `TopKBallots` counted at once
+PAIR_CHUNK = 1 << 20
+
+
+class Profile:
+    '''
+    Anonymous profile: the distinct rankings cast in an election with
+    the number of ballots casting each one
+
+    Real elections have far fewer distinct rankings than ballots, so a
+    profile can be much smaller than the ballots array (as described in
+    `elect`) it represents. `elect`, `utils.info`, `margins_from_ballots`
+    and `MarginsAccumulator` accept a profile anywhere they accept
+    ballots; like a ballots array, a profile has a `shape` of
+    `(n_ballots, n_candidates)` and indexing it with a ballot number
+    returns that ballot.
+
+    Example:
+    >>> profile = Profile.from_ballots(ballots)
+    >>> profile.rankings  # distinct ballots
+    >>> profile.counts  # number of ballots per ranking
+    '''
+
+    def __init__(self, rankings, counts):
+        '''
+        `rankings`:
+            2D array with one distinct ballot (as described in `elect`)
+            per row
+
+        `counts`:
+            number of ballots casting each ranking
+        '''
+        self.rankings = np.asarray(rankings)
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+        if (
+            self.rankings.ndim != 2
+            or self.counts.shape != self.rankings.shape[:1]
+            or (self.counts < 0).any()
+        ):
+            raise ValueError(
+                '`rankings` must be a 2D array of ballots and `counts` a '
+                'matching list of non-negative ballot counts (one per '
+                'ranking)'
+            )
+
+    @classmethod
+    def from_ballots(cls, ballots, counts=None):
+        '''
+        Build a profile from a 2D array of `ballots` (as described in
+        `elect`) by merging identical ballots
+
+        `counts=None`:
+            number of ballots each row of `ballots` stands for; if
+            `None`, every row is one ballot
+        '''
+        ballots = np.asarray(ballots)
+        rankings, inverse = np.unique(ballots, axis=0, return_inverse=True)
+        weights = None if counts is None else np.asarray(counts)
+        totals = np.bincount(
+            inverse.ravel(), weights=weights, minlength=len(rankings)
+        )
+
+        return cls(rankings, totals.astype(np.int64))
+
+    @property
+    def n_candidates(self):
+        '''Number of candidates ranked on every ballot'''
+        return self.rankings.shape[1]
+
+    @property
+    def n_ballots(self):
+        '''Total number of ballots in the profile'''
+        return int(self.counts.sum())
+
+    @property
+    def shape(self):
+        '''Shape of the equivalent ballots array'''
+        return (self.n_ballots, self.n_candidates)
+
+    def __len__(self):
+        return self.n_ballots
+
+    def __getitem__(self, i):
+        '''Return ballot number `i` of the equivalent ballots array'''
+        if not -self.n_ballots <= i < self.n_ballots:
+            raise IndexError('ballot index out of range')
+
+        i %= self.n_ballots
+        return self.rankings[
+            np.searchsorted(np.cumsum(self.counts), i, side='right')
+        ]
+
+    def expand(self):
+        '''Return the equivalent ballots array (one row per ballot)'''
+        return np.repeat(self.rankings, self.counts, axis=0)
+
+
+class TopKBallots:
+    '''
+    Truncated ballots stored sparsely: each ballot is the ordered list
+    of the candidates it ranks (most preferred first), and every other
+    candidate is implicitly tied last
+
+    A ballot ranking `k` of `n` candidates costs `k` indices instead of
+    `n` ranks, and tallying it (see `pairwise_wins`) costs `k * (k - 1)
+    / 2` pair updates instead of `n * n` comparisons. Like a `Profile`,
+    it can be used anywhere ballots are accepted; indexing it returns
+    the equivalent dense ballot (as described in `elect`).
+
+    Example:
+    >>> ballots = TopKBallots.from_lists([[4, 0], [1], [0, 1, 2]], 2000)
+    >>> margins_from_ballots(ballots)
+    '''
+
+    def __init__(self, candidates, offsets, n_candidates, counts=None):
+        '''
+        `candidates`:
+            the ranked candidates of all ballots, concatenated
+
+        `offsets`:
+            start of each ballot in `candidates`, followed by the total
+            length (so ballot `i` is `candidates[offsets[i]:offsets[i +
+            1]]`)
+
+        `n_candidates`:
+            the number of candidates in the election
+
+        `counts=None`:
+            number of ballots each ballot stands for; if `None`, one
+        '''
+        self.candidates = np.asarray(candidates)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.n_candidates = n_candidates
+        n_rows = len(self.offsets) - 1
+        self.counts = np.ones(n_rows, dtype=np.int64) if counts is None \
+            else np.asarray(counts, dtype=np.int64)
+
+        valid_offsets = (
+            self.candidates.ndim == 1 and n_rows >= 0
+            and self.offsets[0] == 0
+            and self.offsets[-1] == len(self.candidates)
+            and (np.diff(self.offsets) >= 0).all()
+        )
+        valid_candidates = valid_offsets and not (
+            (self.candidates < 0) | (self.candidates >= n_candidates)
+        ).any()
+        if valid_candidates:
+            # a candidate ranked twice on a ballot repeats its cell
+            cells = np.repeat(
+                np.arange(n_rows, dtype=np.int64), np.diff(self.offsets)
+            ) * n_candidates + self.candidates
+            valid_candidates = len(np.unique(cells)) == len(cells)
+        if (
+            not valid_candidates
+            or self.counts.shape != (n_rows,) or (self.counts < 0).any()
+        ):
+            raise ValueError(
+                '`candidates` must be the concatenated ranked candidates '
+                '(0 to `n_candidates - 1`, each at most once per ballot) '
+                'of the ballots starting at `offsets`, with one '
+                'non-negative count per ballot'
+            )
+
+    @classmethod
+    def from_lists(cls, ballots, n_candidates, counts=None):
+        '''
+        Build sparse ballots from a list of `ballots`, each a list of
+        candidate indices in order of preference
+        '''
+        lengths = [len(ballot) for ballot in ballots]
+        dtype = np.min_scalar_type(max(n_candidates - 1, 0))
+        candidates = np.fromiter(
+            (candidate for ballot in ballots for candidate in ballot),
+            dtype=dtype, count=sum(lengths),
+        )
+
+        return cls(
+            candidates, np.concatenate([[0], np.cumsum(lengths)]),
+            n_candidates, counts,
+        )
+
+    @property
+    def n_ballots(self):
+        '''Total number of ballots'''
+        return int(self.counts.sum())
+
+    @property
+    def shape(self):
+        '''Shape of the equivalent ballots array'''
+        return (self.n_ballots, self.n_candidates)
+
+    @property
+    def lengths(self):
+        '''Number of candidates ranked by each ballot'''
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return self.n_ballots
+
+    def _dense(self, rows):
+        '''Return the dense ballots of the stored ballots `rows`'''
+        dense = np.empty((len(rows), self.n_candidates), dtype=np.int64)
+        dense[:] = (self.lengths[rows] + 1)[:, np.newaxis]
+        for i, row in enumerate(rows):
+            ranked = self.candidates[self.offsets[row]:self.offsets[row + 1]]
+            dense[i, ranked] = np.arange(1, len(ranked) + 1)
+
+        return dense
+
+    def __getitem__(self, i):
+        '''Return ballot number `i` of the equivalent ballots array'''
+        if not -self.n_ballots <= i < self.n_ballots:
+            raise IndexError('ballot index out of range')
+
+        i %= self.n_ballots
+        row = np.searchsorted(np.cumsum(self.counts), i, side='right')
+        return self._dense([row])[0]
+
+    def groups(self):
+        '''
+        Yield `(prefixes, counts)` for every ballot length `k`, where
+        `prefixes` is a 2D array of the ballots ranking `k` candidates
+        '''
+        lengths = self.lengths
+        for k in np.unique(lengths):
+            rows = np.flatnonzero(lengths == k)
+            prefixes = self.candidates[
+                self.offsets[rows][:, np.newaxis] + np.arange(k)
+            ]
+            yield prefixes, self.counts[rows]
+
+    def expand(self):
+        '''Return the equivalent ballots array (one row per ballot)'''
+        return np.repeat(
+            self._dense(range(len(self.counts))), self.counts, axis=0
+        )
+
+    def pairwise_wins(self, chunk_size=None):
+        '''
+        Return the integer matrix `wins` with `wins[i, j]` the number of
+        ballots preferring `i` to `j` (see `pairwise_wins`), counting
+        only the pairs of ranked candidates on each ballot
+
+        `chunk_size=None`:
+            number of ballots counted at once; if `None`, as many as
+            hold `PAIR_CHUNK` ranked pairs
+        '''
+        n = self.n_candidates
+
+        # `before[i, j]`: ballots ranking both `i` and `j`, `i` first
+        before = np.zeros(n * n, dtype=np.int64)
+        for prefixes, counts in self.groups():
+            first, second = np.triu_indices(prefixes.shape[1], 1)
+            rows = chunk_size or max(1, PAIR_CHUNK // max(1, len(first)))
+            for start in range(0, len(prefixes), rows):
+                chunk = prefixes[start:start + rows].astype(np.int64)
+                pairs = chunk[:, first] * n + chunk[:, second]
+                before += np.bincount(
+                    pairs.ravel(), minlength=n * n,
+                    weights=np.repeat(counts[start:start + rows], len(first)),
+                ).astype(np.int64)
+        before = before.reshape(n, n)
+
+        # a ranked candidate beats every candidate not ranked before it
+        ranked = np.bincount(
+            self.candidates, minlength=n,
+            weights=np.repeat(self.counts, self.lengths),
+        ).astype(np.int64)
+        wins = ranked[:, np.newaxis] - before.T
+        np.fill_diagonal(wins, 0)
+
+        return wins
@@ -0,0 +1,67 @@
+'''Complete Split Cycle rankings from a single defeat computation'''
+
+import numpy as np
+from .core import MarginMatrix, defeat_matrix, is_margin_like
+from .errors import not_margin_like
+
+
+def peel_defeats(defeats):
+    '''
+    Split candidates into tiers by repeatedly removing the candidates
+    undefeated among those remaining, given an acyclic `defeats` matrix
+    (as returned by `defeat_matrix`)
+
+    Returns a list of tiers, each a sorted list of candidates
+    '''
+    defeats = np.asarray(defeats, dtype=bool)
+    remaining = np.ones(defeats.shape[0], dtype=bool)
+
+    # number of remaining candidates defeating each candidate, updated
+    # as tiers are removed instead of recomputed
+    defeaters = np.count_nonzero(defeats, axis=0)
+
+    tiers = []
+    while remaining.any():
+        tier = np.flatnonzero(remaining & (defeaters == 0))
+        if not tier.size:
+            raise ValueError('`defeats` must not contain a cycle')
+
+        tiers.append(tier.tolist())
+        remaining[tier] = False
+        defeaters -= np.count_nonzero(defeats[tier], axis=0)
+
+    return tiers
+
+
+def splitcycle_ranking(margins):
+    '''
+    Rank all candidates by the Split Cycle defeat relation of the whole
+    election: the winners first, then the candidates not defeated by any
+    remaining candidate once the winners are removed, and so on
+
+    `margins`:
+        a margins matrix (as described in `splitcycle`), or a
+        `MarginMatrix` whose cached defeats are reused
+
+    The defeat relation is computed once (see `defeat_matrix`) and
+    undefeated candidates are peeled off it tier by tier; this matches
+    calling `splitcycle` again with the remaining candidates as
+    `candidates` after each tier, without redoing any path search.
+
+    Defeats keep counting paths through removed candidates, so tiers
+    after the first are not always the SplitCycle winners of the
+    election restricted to the remaining candidates (see
+    `subsets.subset_winners`), whose defeats only count paths among
+    them.
+
+    Returns a list of tiers, each a sorted list of candidates; the first
+    tier is the list of SplitCycle winners
+    '''
+    if isinstance(margins, MarginMatrix):
+        return peel_defeats(margins.defeats)
+
+    margins = np.asarray(margins)
+    if not is_margin_like(margins):
+        not_margin_like()
+
+    return peel_defeats(defeat_matrix(margins))
@@ -0,0 +1,286 @@
+'''
+Local SplitCycle service: a long-running asyncio server that keeps a
+warm `SplitCycleEngine`, so that short-lived callers (e.g. web workers)
+pay neither import nor pool startup per request
+
+Clients connect over a Unix socket (or TCP on localhost) and exchange
+JSON lines: one request object per line, answered by one response
+object per line, in order. A request holds either `margins` (as
+described in `splitcycle`) or `ballots` (as described in `elect`), and
+optionally an `id` echoed in the response and `candidates` names to map
+winners to:
+
+    {"id": 1, "ballots": [[1, 2, 3], [2, 1, 3]], "candidates": ["A", "B", "C"]}
+    {"id": 1, "winners": ["A", "B"]}
+
+A request `{"metrics": true}` returns the server's latency and
+throughput metrics instead (see `SplitCycleServer.metrics`), and
+failures are reported as `{"id": ..., "error": "..."}`.
+
+Concurrent small elections (fewer than `batch_candidates` candidates)
+are coalesced for up to `batch_window` seconds and resolved together
+with `splitcycle_batch`, one vectorized call per number of candidates;
+larger ones go to the engine's worker pool. Run with:
+
+$ python -m splitcycle.server --socket /tmp/splitcycle.sock
+'''
+
+import argparse
+import asyncio
+import json
+import socket
+import time
+from collections import deque
+import numpy as np
+from .core import SERIAL_THRESHOLD, SplitCycleEngine, is_margin_like, \
+    margins_from_ballots, splitcycle, splitcycle_batch
+from .errors import not_margin_like
+
+# number of recent request latencies kept for percentiles
+LATENCY_WINDOW = 10000
+
+# longest request line accepted, in bytes
+MAX_REQUEST_BYTES = 1 << 26
+
+
+class SplitCycleServer:  # pylint: disable=too-many-instance-attributes
+    '''
+    Micro-batching SplitCycle evaluator behind the local JSON-lines
+    service; `evaluate` may also be awaited directly from asyncio code
+
+    Example:
+    >>> server = SplitCycleServer()
+    >>> asyncio.run(server.serve('/tmp/splitcycle.sock'))
+    '''
+
+    def __init__(
+            self, executor=None, batch_window=0.002, max_batch=256,
+            batch_candidates=SERIAL_THRESHOLD
+        ):
+        '''
+        `executor=None`:
+            `SplitCycleEngine` for elections too large to batch; if
+            `None`, a new engine is started and owned by the server
+
+        `batch_window=0.002`:
+            seconds to wait for more requests to join a batch
+
+        `max_batch=256`:
+            largest number of elections resolved in one batch
+
+        `batch_candidates=SERIAL_THRESHOLD`:
+            elections with fewer candidates are batched
+        '''
+        self.executor = SplitCycleEngine() if executor is None else executor
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batch_candidates = batch_candidates
+        self._queue = None
+        self._started = time.monotonic()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counters = dict.fromkeys(
+            ('requests', 'errors', 'batches', 'batched_elections'), 0
+        )
+
+    async def evaluate(self, margins):
+        '''Return the sorted SplitCycle winners of `margins`'''
+        margins = np.asarray(margins)
+        loop = asyncio.get_running_loop()
+        if margins.ndim != 2 or margins.shape[0] >= self.batch_candidates:
+            return await loop.run_in_executor(
+                None, lambda: splitcycle(margins, executor=self.executor)
+            )
+
+        # validated here, so that one bad request cannot fail a batch
+        if not is_margin_like(margins):
+            not_margin_like()
+
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            loop.create_task(self._batcher())
+
+        future = loop.create_future()
+        await self._queue.put((margins, future))
+        return await future
+
+    async def _batcher(self):
+        '''Resolve queued small elections in batches, forever'''
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(await asyncio.wait_for(
+                        self._queue.get(), deadline - loop.time()
+                    ))
+                except asyncio.TimeoutError:
+                    break
+
+            # one vectorized call per number of candidates
+            groups = {}
+            for margins, future in batch:
+                groups.setdefault(margins.shape[0], []).append(
+                    (margins, future)
+                )
+            for group in groups.values():
+                await self._resolve(loop, group)
+
+    async def _resolve(self, loop, group):
+        '''Resolve a `group` of same-sized elections with one batch call'''
+        self._counters['batches'] += 1
+        self._counters['batched_elections'] += len(group)
+        try:
+            stack = np.stack([margins for margins, _ in group])
+            winners = await loop.run_in_executor(
+                None, splitcycle_batch, stack
+            )
+        # any failure is the batch's, and must not stop the batcher
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), mask in zip(group, winners):
+            if not future.done():
+                future.set_result(np.flatnonzero(mask).tolist())
+
+    async def handle(self, request):
+        '''Return the response object to a decoded `request`'''
+        if request.get('metrics'):
+            return self.metrics()
+
+        start = time.perf_counter()
+        self._counters['requests'] += 1
+        response = {'id': request.get('id')}
+        try:
+            if 'margins' in request:
+                margins = np.asarray(request['margins'])
+            elif 'ballots' in request:
+                # tallied off the event loop, which serves every client
+                margins = await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: margins_from_ballots(
+                        np.asarray(request['ballots'])
+                    )
+                )
+            else:
+                raise ValueError('requests need `margins` or `ballots`')
+
+            winners = await self.evaluate(margins)
+            names = request.get('candidates')
+            response['winners'] = winners if names is None \
+                else [names[i] for i in winners]
+        except (IndexError, TypeError, ValueError) as error:
+            self._counters['errors'] += 1
+            response['error'] = str(error) or type(error).__name__
+
+        self._latencies.append(time.perf_counter() - start)
+        return response
+
+    def metrics(self):
+        '''
+        Return the number of `requests`, `errors`, `batches` and
+        `batched_elections` served, the `uptime` and `throughput`
+        (requests per second since startup), and the mean, median and
+        99th percentile latency in seconds of recent requests
+        '''
+        uptime = time.monotonic() - self._started
+        latencies = np.array(self._latencies)
+        metrics = dict(self._counters)
+        metrics.update(
+            uptime=uptime,
+            throughput=metrics['requests'] / uptime if uptime else 0.0,
+            latency_mean=None, latency_p50=None, latency_p99=None,
+        )
+        if latencies.size:
+            metrics['latency_mean'] = float(latencies.mean())
+            metrics['latency_p50'], metrics['latency_p99'] = (
+                float(p) for p in np.percentile(latencies, [50, 99])
+            )
+
+        return metrics
+
+    async def _connection(self, reader, writer):
+        '''Answer the JSON-lines requests of one client connection'''
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.handle(json.loads(line))
+                except (
+                    json.JSONDecodeError, UnicodeDecodeError, AttributeError
+                ):
+                    response = {'error': 'requests must be JSON objects'}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ValueError:
+            # request line longer than `MAX_REQUEST_BYTES`
+            writer.write(b'{"error": "request too long"}\n')
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path=None, host='127.0.0.1', port=None):
+        '''
+        Serve requests on the Unix socket at `path`, or on TCP `host`
+        and `port` if `path` is `None`, until cancelled
+        '''
+        # warm the pool before the first large request needs it
+        self.executor.start()
+
+        if path is not None:
+            server = await asyncio.start_unix_server(
+                self._connection, path, limit=MAX_REQUEST_BYTES
+            )
+        else:
+            server = await asyncio.start_server(
+                self._connection, host, port, limit=MAX_REQUEST_BYTES
+            )
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.close()
+
+
+def query(path, request):
+    '''
+    Send one `request` object to the server listening on the Unix socket
+    at `path` (or a `(host, port)` pair) and return its response, without
+    asyncio
+    '''
+    family = socket.AF_UNIX if isinstance(path, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall(json.dumps(request).encode() + b'\n')
+        with client.makefile('rb') as responses:
+            return json.loads(responses.readline())
+
+
+def main(argv=None):
+    '''Run the local SplitCycle server with arguments `argv`'''
+    parser = argparse.ArgumentParser(
+        prog='python -m splitcycle.server',
+        description='Serve SplitCycle winners as JSON lines.',
+    )
+    parser.add_argument('--socket', help='Unix socket path to listen on')
+    parser.add_argument('--port', type=int, help='localhost TCP port')
+    parser.add_argument(
+        '--batch-window', type=float, default=0.002,
+        help='seconds to wait for requests to batch (default: 0.002)',
+    )
+    args = parser.parse_args(argv)
+    if (args.socket is None) == (args.port is None):
+        parser.error('give exactly one of --socket and --port')
+
+    server = SplitCycleServer(batch_window=args.batch_window)
+    try:
+        asyncio.run(server.serve(args.socket, port=args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+'''
+Zero-copy transport of arrays to worker processes through
+`multiprocessing.shared_memory`
+
+The owning process copies an array into a shared memory segment once
+with `SharedArray`; tasks then carry only its small, picklable
+`SharedHandle`, and workers map the segment with `attach` instead of
+unpickling a copy of the array per task:
+
+>>> with SharedArray(margins) as shared:
+...     pool.map(work, [(shared.handle, chunk) for chunk in chunks])
+
+Leaving the `with` block (or calling `close`) unlinks the segment.
+Pools must be started with `start_pool` (or after `start_tracker`), so
+that workers share the owner's resource tracker instead of unlinking
+segments they attached when they exit.
+
+Workers keep the most recently attached segment mapped, so consecutive
+tasks over the same array attach only once. An unlinked segment stays
+resident while it is mapped, so once it is unlinked, the owner should
+have every worker of a pool from `start_pool` release it with
+`release_workers`. Releasing waits for every worker to finish the tasks
+it is running, for at most `RELEASE_TIMEOUT` seconds.
+'''
+
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+# arrays smaller than this many bytes are cheaper to pickle than to share
+SHARED_BYTES = 1 << 16
+
+# picklable reference to an array in a shared memory segment
+SharedHandle = namedtuple('SharedHandle', ('name', 'shape', 'dtype'))
+
+# seconds a worker waits for the rest of its pool in `release_workers`
+RELEASE_TIMEOUT = 10
+
+# segment attached by this (worker) process: name to `(memory, array)`
+_ATTACHED = {}
+
+# `barrier` shared by the workers of this process's pool, if any
+_WORKER = {}
+
+
+class SharedArray:
+    '''
+    Copy of an array in a new shared memory segment, owned by the
+    creating process until `close` (or the end of a `with` block)
+    '''
+
+    def __init__(self, array):
+        '''
+        `array`:
+            the array to copy into shared memory
+        '''
+        array = np.asarray(array)
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=max(1, array.nbytes)
+        )
+        self.array = np.ndarray(
+            array.shape, dtype=array.dtype, buffer=self._memory.buf
+        )
+        self.array[...] = array
+        self.handle = SharedHandle(
+            self._memory.name, array.shape, array.dtype.str
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        '''Release and unlink the shared memory segment'''
+        if self._memory is not None:
+            self.array = None
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+
+def start_tracker():
+    '''
+    Start this process's shared memory resource tracker, if needed;
+    call before starting worker processes that will `attach` arrays
+    '''
+    if os.name == 'posix':
+        resource_tracker.ensure_running()
+
+
+def attach(handle):
+    '''
+    Return the array referenced by `handle` (a `SharedHandle`), mapped
+    without copying; any other array is returned unchanged
+
+    The mapping stays valid until this process attaches another segment,
+    so the array must not be kept beyond the task it was attached for.
+    '''
+    if not isinstance(handle, SharedHandle):
+        return handle
+
+    if handle.name not in _ATTACHED:
+        detach()
+        memory = shared_memory.SharedMemory(name=handle.name)
+        array = np.ndarray(
+            handle.shape, dtype=np.dtype(handle.dtype), buffer=memory.buf
+        )
+        array.flags.writeable = False
+        _ATTACHED[handle.name] = (memory, array)
+
+    return _ATTACHED[handle.name][1]
+
+
+def detach():
+    '''Release the segment attached by this process, if any'''
+    if _ATTACHED:
+        # drop the array mapping the segment before closing it
+        memory = next(iter(_ATTACHED.values()))[0]
+        _ATTACHED.clear()
+        memory.close()
+
+
+def _init_worker(barrier):
+    '''Remember the `barrier` shared by the workers of a pool'''
+    _WORKER['barrier'] = barrier
+
+
+def start_pool(processes):
+    '''
+    Start a pool of `processes` workers that can `attach` arrays
+
+    Returns the pool and the barrier its workers share, to pass to
+    `release_workers`
+    '''
+    start_tracker()
+    barrier = multiprocessing.Barrier(processes)
+    # the caller owns the pool
+    pool = multiprocessing.Pool(  # pylint: disable=consider-using-with
+        processes, _init_worker, (barrier,)
+    )
+
+    return pool, barrier
+
+
+def _release(_):
+    '''
+    Detach, then wait until every worker of the pool has detached;
+    returns the process id of the worker
+    '''
+    detach()
+    try:
+        # a worker waiting here cannot take a second release task
+        _WORKER['barrier'].wait(RELEASE_TIMEOUT)
+    except (KeyError, threading.BrokenBarrierError):
+        pass
+
+    return os.getpid()
+
+
+def release_workers(pool, barrier):
+    '''
+    Have each worker of `pool` release the segment it attached, given
+    the pool and `barrier` returned by `start_pool`
+
+    Returns the set of process ids of the workers released; if a worker
+    stayed busy beyond `RELEASE_TIMEOUT`, another may have been released
+    twice in its stead, and the barrier is reset for the next release.
+    '''
+    released = set(pool.map(_release, range(barrier.parties), chunksize=1))
+    if barrier.broken:
+        # every release task has returned, so none is waiting on it
+        barrier.reset()
+
+    return released
+
+
+def share(array, threshold=SHARED_BYTES):
+    '''
+    Return a `SharedArray` of `array` if it is at least `threshold`
+    bytes, otherwise `None` (the array is cheaper to pickle)
+    '''
+    array = np.asarray(array)
+    return SharedArray(array) if array.nbytes >= threshold else None
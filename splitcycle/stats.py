@@ -0,0 +1,81 @@
+'''Optional instrumentation of SplitCycle computations'''
+
+import time
+from contextlib import contextmanager
+
+
+class SplitCycleStats:
+    '''
+    Timings and counters collected while computing SplitCycle winners
+
+    Pass an instance as `stats` to `splitcycle` (or `elect`) to collect
+    them; the same instance may be reused to accumulate over many calls.
+    When `stats` is not given, no instrumented code runs at all.
+
+    `timings`:
+        seconds spent in each phase, e.g. `validation`, `pool_startup`,
+        `pickling`, `search`, `strongest_paths` and `defeats`
+
+    `searches`, `nodes_visited`, `early_exits`:
+        number of strong path searches, nodes marked visited across all
+        searches, and candidates whose searches stopped early because a
+        defeat was found
+
+    `payload_bytes`:
+        bytes pickled to send work to worker processes
+
+    `worker_load`:
+        per worker process id, the number of candidates evaluated,
+        searches run and seconds spent
+    '''
+
+    def __init__(self):
+        self.calls = 0
+        self.timings = {}
+        self.searches = 0
+        self.nodes_visited = 0
+        self.early_exits = 0
+        self.payload_bytes = 0
+        self.worker_load = {}
+
+    def __repr__(self):
+        return f'SplitCycleStats({self.as_dict()})'
+
+    @contextmanager
+    def phase(self, name):
+        '''Context manager adding the time spent inside it to phase `name`'''
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.timings[name] = self.timings.get(name, 0) \
+                + time.perf_counter() - start
+
+    def add_worker(self, counters):
+        '''
+        Add the `counters` reported by one unit of search work (see
+        `count_splitcycle_winners`)
+        '''
+        self.searches += counters['searches']
+        self.nodes_visited += counters['nodes_visited']
+        self.early_exits += counters['early_exits']
+
+        load = self.worker_load.setdefault(
+            counters['pid'], {'candidates': 0, 'searches': 0, 'seconds': 0}
+        )
+        for key in load:
+            load[key] += counters[key]
+
+    def as_dict(self):
+        '''Return all timings and counters as a plain dictionary'''
+        return {
+            'calls': self.calls,
+            'timings': dict(self.timings),
+            'searches': self.searches,
+            'nodes_visited': self.nodes_visited,
+            'early_exits': self.early_exits,
+            'payload_bytes': self.payload_bytes,
+            'worker_load': {
+                pid: dict(load) for pid, load in self.worker_load.items()
+            },
+        }
@@ -0,0 +1,152 @@
+'''
+Compact in-memory and on-disk storage of ballots
+
+Ranks are small non-negative integers, so ballots can be stored with
+one or two bytes per rank instead of eight. The binary ballot format
+written by `BallotWriter` is a fixed-size header followed by the ranks
+in row-major order; `open_ballots` maps it into memory with `np.memmap`,
+so margins can be computed from files much larger than memory with a
+fixed footprint:
+
+>>> with BallotWriter('election.ballots', n_candidates=20) as writer:
+...     for batch in batches:
+...         writer.write(batch)
+>>> margins_from_ballots(open_ballots('election.ballots'))
+'''
+
+import numpy as np
+
+# header of the binary ballot format (padded to `HEADER_BYTES`)
+HEADER = np.dtype([
+    ('magic', 'S4'),
+    ('dtype', 'S4'),
+    ('n_candidates', '<u4'),
+    ('n_ballots', '<u8'),
+])
+HEADER_BYTES = 32
+MAGIC = b'SCB1'
+
+
+def rank_dtype(n_candidates):
+    '''
+    Smallest unsigned integer dtype that can hold every rank of a ballot
+    over `n_candidates` candidates (ranks `1` to `n_candidates`, plus
+    one more for unranked candidates, as described in `elect`)
+    '''
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n_candidates + 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    return np.dtype(np.uint64)
+
+
+def _read_header(path):
+    '''Return the header record of the binary ballot file at `path`'''
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if header.size != 1 or header['magic'][0] != MAGIC:
+        raise ValueError(f'`{path}` is not a binary ballot file')
+
+    return header[0]
+
+
+class BallotWriter:
+    '''
+    Write ballots (as described in `elect`, fully ranked) to a binary
+    ballot file in batches, so that the ballots never have to be held
+    in memory at once
+
+    The header is completed when the writer is closed; use the writer
+    as a context manager to ensure this happens.
+    '''
+
+    def __init__(self, path, n_candidates, dtype=None):
+        '''
+        `path`:
+            file to (over)write
+
+        `n_candidates`:
+            the number of candidates ranked on every ballot
+
+        `dtype=None`:
+            integer dtype of the stored ranks; if `None`, use
+            `rank_dtype(n_candidates)`
+        '''
+        self.path = path
+        self.n_candidates = n_candidates
+        self.dtype = rank_dtype(n_candidates) if dtype is None \
+            else np.dtype(dtype)
+        self.n_ballots = 0
+        self._file = open(path, 'wb')  # pylint: disable=consider-using-with
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_header(self):
+        '''Write the header for the ballots written so far'''
+        header = np.zeros(1, dtype=HEADER)
+        header['magic'] = MAGIC
+        header['dtype'] = self.dtype.str.encode()
+        header['n_candidates'] = self.n_candidates
+        header['n_ballots'] = self.n_ballots
+
+        self._file.seek(0)
+        self._file.write(header.tobytes().ljust(HEADER_BYTES, b'\0'))
+        self._file.seek(0, 2)  # back to the end of the file
+
+    def write(self, ballots):
+        '''Append a 2D array of `ballots` (one ballot per row)'''
+        ballots = np.asarray(ballots)
+        if ballots.ndim != 2 or ballots.shape[1] != self.n_candidates:
+            raise ValueError(
+                f'`ballots` must be a 2D array with {self.n_candidates} '
+                'ranks per ballot'
+            )
+        limit = np.iinfo(self.dtype).max
+        if ballots.size and (ballots.min() < 0 or ballots.max() > limit):
+            raise ValueError(
+                f'Ranks must lie between 0 and {limit} to be stored as '
+                f'`{self.dtype}` (augment truncated ballots first)'
+            )
+
+        self._file.write(ballots.astype(self.dtype).tobytes())
+        self.n_ballots += ballots.shape[0]
+
+    def close(self):
+        '''Complete the header and close the file'''
+        if not self._file.closed:
+            self._write_header()
+            self._file.close()
+
+
+def write_ballots(path, ballots, dtype=None):
+    '''
+    Write a 2D array of `ballots` to a binary ballot file at `path` (see
+    `BallotWriter`)
+    '''
+    ballots = np.asarray(ballots)
+    with BallotWriter(path, ballots.shape[1], dtype) as writer:
+        writer.write(ballots)
+
+
+def open_ballots(path, mode='r'):
+    '''
+    Map the binary ballot file at `path` into memory without reading it
+
+    `mode='r'`:
+        `np.memmap` access mode
+
+    Returns a `np.memmap` of shape `(n_ballots, n_candidates)` that can
+    be used with `margins_from_ballots`, `elect` or `MarginsAccumulator`
+    like any ballots array; only the chunk being tallied is read
+    '''
+    header = _read_header(path)
+
+    return np.memmap(
+        path, dtype=np.dtype(header['dtype'].decode()), mode=mode,
+        offset=HEADER_BYTES,
+        shape=(int(header['n_ballots']), int(header['n_candidates'])),
+    )
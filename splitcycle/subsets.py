@@ -0,0 +1,107 @@
+'''
+Evaluation of SplitCycle on many candidate subsets of one election, as
+used in spoiler, clone and independence analyses
+'''
+
+from itertools import combinations, groupby, islice
+import numpy as np
+from .core import defeat_matrix, is_margin_like
+from .errors import not_margin_like
+
+
+def all_subsets(n_candidates, min_size=1):
+    '''
+    Lazily enumerate every subset of `range(n_candidates)` with at least
+    `min_size` candidates, as sorted tuples in order of increasing size
+    '''
+    for size in range(min_size, n_candidates + 1):
+        yield from combinations(range(n_candidates), size)
+
+
+def subset_winners(margins, subsets=None, batch_size=1024):
+    '''
+    Determine the SplitCycle winners of the elections restricted to
+    each of many candidate `subsets` of a single `margins` matrix (as
+    described in `splitcycle`)
+
+    `subsets=None`:
+        iterable of candidate index sequences, consumed lazily; if
+        `None`, use every subset with at least two candidates (see
+        `all_subsets`)
+
+    `batch_size=1024`:
+        number of consecutive subsets of equal size whose winners are
+        computed together in one vectorized pass
+
+    Removing candidates can only remove paths, so any defeat in the full
+    election is also a defeat in every subset containing both
+    candidates. The full defeat relation is therefore computed once and
+    shared: subsets left with a single candidate undefeated by it are
+    resolved without any further path computation, and only the rest go
+    through a batched strongest path pass.
+
+    Yields `(subset, winners)` pairs in the order of `subsets`, where
+    `winners` is a sorted list of candidate indices in `margins`
+    '''
+    margins = np.asarray(margins)
+    if not is_margin_like(margins):
+        not_margin_like()
+
+    if subsets is None:
+        subsets = all_subsets(margins.shape[0], min_size=2)
+
+    full_defeats = defeat_matrix(margins)
+
+    # group consecutive subsets of equal size, then split into batches
+    for _, group in groupby(map(tuple, subsets), key=len):
+        while batch := list(islice(group, batch_size)):
+            yield from zip(batch, _batch_winners(margins, full_defeats, batch))
+
+
+def _batch_winners(margins, full_defeats, batch):
+    '''
+    Return the sorted winner lists of a `batch` of equally sized
+    candidate subsets (see `subset_winners`)
+    '''
+    indices = np.array(batch, dtype=np.intp)
+    rows, cols = indices[:, :, np.newaxis], indices[:, np.newaxis, :]
+
+    # candidates surviving the defeats inherited from the full election
+    undefeated = ~full_defeats[rows, cols].any(axis=1)
+
+    # every election has a winner, so a lone survivor is the winner
+    unresolved = undefeated.sum(axis=1) > 1
+    if unresolved.any():
+        undefeated[unresolved] = ~defeat_matrix(
+            margins[rows[unresolved], cols[unresolved]]
+        ).any(axis=1)
+
+    return [
+        subset[undefeated[i]].tolist() for i, subset in enumerate(indices)
+    ]
+
+
+def winner_changes(margins, subsets=None, batch_size=1024):
+    '''
+    Find the candidate subsets on which the SplitCycle winners differ
+    from the winners of the full election (restricted to the subset),
+    e.g. where removing a losing candidate changes the outcome
+
+    Takes the same arguments as `subset_winners`; subsets that contain
+    none of the full election's winners are skipped, since their
+    winners necessarily differ.
+
+    Yields `(subset, winners)` pairs for every such subset
+    '''
+    margins = np.asarray(margins)
+    if not is_margin_like(margins):
+        not_margin_like()
+
+    full_winners = set(
+        np.flatnonzero(~defeat_matrix(margins).any(axis=0)).tolist()
+    )
+
+    for subset, winners in subset_winners(margins, subsets, batch_size):
+        expected = full_winners.intersection(subset)
+        if expected and set(winners) != expected:
+            yield subset, winners
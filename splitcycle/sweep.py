@@ -0,0 +1,211 @@
+'''
+Simulation sweeps: SplitCycle winners of many random elections over a
+grid of voter models, numbers of candidates and numbers of voters
+
+Every grid point is split into chunks of trials, which are handed out
+to worker processes. Each chunk draws from its own seed stream, derived
+from the sweep `seed` and the chunk's position in the grid, so results
+do not depend on the number of processes or the order chunks finish in.
+Per-chunk totals are appended to a CSV file as soon as they arrive; the
+same file serves as the checkpoint, and running the same sweep again
+only computes the chunks missing from it.
+
+Example:
+>>> run_sweep('sweep.csv', ['ic', 'mallows-0.5'], [5, 10], [11, 101])
+>>> summarize('sweep.csv')
+'''
+
+import csv
+import os
+import time
+from itertools import product
+from multiprocessing import Pool
+import numpy as np
+from .core import SplitCycleEngine, condorcet_winner, margins_from_ballots, \
+    splitcycle
+from .utils import gen_random_ballots
+
+# columns of a sweep CSV file; the first four identify a chunk
+FIELDS = (
+    'model', 'candidates', 'voters', 'chunk', 'trials', 'winners',
+    'multiple_winners', 'condorcet_winners', 'seconds',
+)
+
+# runs the `search` engine in-process, as sweeps already use every core
+_SERIAL = SplitCycleEngine(processes=1, serial_threshold=float('inf'))
+
+
+def _chunk_key(row):
+    '''Identify the chunk of a CSV `row` (or task)'''
+    return (
+        str(row['model']), int(row['candidates']), int(row['voters']),
+        int(row['chunk']),
+    )
+
+
+def chunk_rng(seed, point, chunk):
+    '''
+    Return the random generator of chunk `chunk` at index `point` of the
+    sweep grid, independent of every other chunk's
+    '''
+    return np.random.default_rng(
+        np.random.SeedSequence(seed, spawn_key=(point, chunk))
+    )
+
+
+def run_chunk(task):
+    '''
+    Run the trials of one chunk described by `task` (a dict with the
+    first five `FIELDS` and `seed`, `point` and `engine`) and return its
+    row of totals
+    '''
+    start = time.perf_counter()
+    rng = chunk_rng(task['seed'], task['point'], task['chunk'])
+    row = {field: task[field] for field in FIELDS[:5]}
+    row.update(winners=0, multiple_winners=0, condorcet_winners=0)
+
+    for _ in range(task['trials']):
+        ballots = gen_random_ballots(
+            task['voters'], task['candidates'], task['model'], rng
+        )
+        margins = margins_from_ballots(ballots)
+        winners = splitcycle(margins, engine=task['engine'], executor=_SERIAL)
+
+        row['winners'] += len(winners)
+        row['multiple_winners'] += len(winners) > 1
+        row['condorcet_winners'] += condorcet_winner(margins) is not None
+
+    row['seconds'] = round(time.perf_counter() - start, 6)
+    return row
+
+
+def completed_chunks(path):
+    '''
+    Return the keys `(model, candidates, voters, chunk)` of the chunks
+    already recorded in the sweep CSV file at `path` (an empty set if it
+    does not exist)
+
+    A last line left incomplete by an interruption is removed from the
+    file, so that its chunk is run again.
+    '''
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, 'r+', newline='', encoding='utf-8') as file:
+        text = file.read()
+        complete = text[:text.rfind('\n') + 1]
+        if len(complete) < len(text):
+            file.seek(len(complete))
+            file.truncate()
+
+    return {_chunk_key(row) for row in csv.DictReader(complete.splitlines())}
+
+
+def sweep_tasks(  # pylint: disable=too-many-arguments
+        models, candidates, voters, trials, *, chunk_size, seed,
+        engine='search', skip=()
+    ):
+    '''
+    Yield the tasks (see `run_chunk`) of a sweep over every combination
+    of `models`, `candidates` and `voters`, with `trials` elections per
+    combination split into chunks of `chunk_size`, except for the chunks
+    whose keys are in `skip` (see `completed_chunks`)
+    '''
+    grid = product(models, candidates, voters)
+    for point, (model, n_candidates, n_voters) in enumerate(grid):
+        for chunk, first in enumerate(range(0, trials, chunk_size)):
+            if (model, n_candidates, n_voters, chunk) in skip:
+                continue
+            yield {
+                'model': model, 'candidates': n_candidates,
+                'voters': n_voters, 'chunk': chunk,
+                'trials': min(chunk_size, trials - first),
+                'seed': seed, 'point': point, 'engine': engine,
+            }
+
+
+def run_sweep(  # pylint: disable=too-many-arguments
+        path, models, candidates, voters, trials=1000, *, chunk_size=100,
+        seed=0, processes=None, engine='search', progress=None
+    ):
+    '''
+    Run a simulation sweep and stream its results to a CSV file
+
+    `path`:
+        the CSV file to append per-chunk totals to (see `FIELDS`);
+        chunks already in it are skipped, which resumes an interrupted
+        sweep
+
+    `models`, `candidates`, `voters`:
+        the voter models (as in `utils.gen_random_ballots`), numbers of
+        candidates and numbers of voters to sweep over
+
+    `trials=1000`:
+        number of random elections per combination
+
+    `chunk_size=100`:
+        number of trials run by a worker at a time, and recorded per row
+
+    `seed=0`:
+        seed of the whole sweep; the same seed reproduces every chunk
+
+    `processes=None`:
+        number of worker processes; if `None`, use all cores
+
+    `engine='search'`:
+        engine used to find winners (see `splitcycle`)
+
+    `progress=None`:
+        callable passed each row as it is written
+
+    Returns the number of chunks run
+    '''
+    tasks = list(sweep_tasks(
+        models, candidates, voters, trials, chunk_size=chunk_size,
+        seed=seed, engine=engine, skip=completed_chunks(path),
+    ))
+
+    with open(path, 'a', newline='', encoding='utf-8') as file, \
+            Pool(processes) as pool:
+        writer = csv.DictWriter(file, FIELDS)
+        if not file.tell():
+            writer.writeheader()
+
+        for row in pool.imap_unordered(run_chunk, tasks):
+            writer.writerow(row)
+            file.flush()
+            if progress is not None:
+                progress(row)
+
+    return len(tasks)
+
+
+def summarize(path):
+    '''
+    Aggregate the chunks of the sweep CSV file at `path` per
+    `(model, candidates, voters)`
+
+    Returns a dict mapping each combination to its total `trials`, the
+    `mean_winners` per election, and the fractions of elections with
+    `multiple_winners` and with a Condorcet winner (`condorcet`)
+    '''
+    totals = {}
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            total = totals.setdefault(_chunk_key(row)[:3], np.zeros(4))
+            total += [
+                int(row[field]) for field in (
+                    'trials', 'winners', 'multiple_winners',
+                    'condorcet_winners',
+                )
+            ]
+
+    return {
+        point: {
+            'trials': int(trials),
+            'mean_winners': winners / trials,
+            'multiple_winners': multiple / trials,
+            'condorcet': condorcet / trials,
+        }
+        for point, (trials, winners, multiple, condorcet) in totals.items()
+    }
@@ -0,0 +1,227 @@
+'''Streaming tallies of ballots into voting margins'''
+
+from itertools import islice
+import numpy as np
+from .core import (
+    defeat_matrix, pairwise_wins, splitcycle, stability_radius,
+    strongest_paths,
+)
+from .errors import not_enough_candidates, mismatched_tallies
+from .profiles import Profile, TopKBallots
+
+
+class MarginsAccumulator:
+    '''
+    Incrementally tally ballots (as described in `elect`) into a voting
+    margins matrix (as described in `splitcycle`) without keeping the
+    ballots themselves in memory
+
+    Only the `n_candidates` by `n_candidates` integer tally is stored,
+    so ballots can be streamed from files larger than memory. Partial
+    accumulators (e.g. one per precinct, process or host) can be
+    combined with `merge`; accumulators are picklable and can be
+    rebuilt from a transmitted tally with `from_tally`.
+
+    Example:
+    >>> acc = MarginsAccumulator(4)
+    >>> acc.consume(ballot_rows)  # any iterable of ballots
+    >>> acc.merge(other_precinct)
+    >>> splitcycle(acc.margins)
+    '''
+
+    def __init__(self, n_candidates, chunk_size=None):
+        '''
+        `n_candidates`:
+            the number of candidates ranked on every ballot
+
+        `chunk_size=None`:
+            number of ballots compared at once (see
+            `margins_from_ballots`)
+        '''
+        self.n_candidates = n_candidates
+        self.chunk_size = chunk_size
+        self.n_ballots = 0
+        self.tally = np.zeros((n_candidates, n_candidates), dtype=np.int64)
+
+    @classmethod
+    def from_tally(cls, tally, n_ballots=0, chunk_size=None):
+        '''
+        Rebuild an accumulator from an integer margins `tally` (e.g. the
+        `tally` attribute of an accumulator from another host) covering
+        `n_ballots` ballots
+        '''
+        tally = np.asarray(tally, dtype=np.int64)
+        acc = cls(tally.shape[0], chunk_size)
+        acc.tally += tally
+        acc.n_ballots = n_ballots
+        return acc
+
+    def add(self, ballots):
+        '''
+        Add a batch of `ballots` (a 2D array with one ballot per row, a
+        single ballot as a 1D array, a `Profile` or `TopKBallots`) to
+        the tally
+
+        Returns the accumulator itself to allow chaining
+        '''
+        if not isinstance(ballots, (Profile, TopKBallots)):
+            ballots = np.asarray(ballots)
+            if ballots.ndim == 1:
+                ballots = ballots[np.newaxis, :]
+        if ballots.shape[1] != self.n_candidates:
+            not_enough_candidates()
+
+        wins = pairwise_wins(ballots, self.chunk_size)
+        self.tally += wins - wins.T
+        self.n_ballots += ballots.shape[0]
+
+        return self
+
+    def consume(self, ballots, batch_size=10000):
+        '''
+        Add every ballot produced by the iterable `ballots` (e.g. a
+        generator reading ballots from disk), tallying them in batches
+        of `batch_size` so that at most one batch is held in memory
+
+        Returns the accumulator itself to allow chaining
+        '''
+        iterator = iter(ballots)
+        while batch := list(islice(iterator, batch_size)):
+            self.add(np.array(batch))
+
+        return self
+
+    def merge(self, other):
+        '''
+        Combine the partial tally of accumulator `other` (over the same
+        candidates) into this one
+
+        Returns the accumulator itself to allow chaining
+        '''
+        if other.n_candidates != self.n_candidates:
+            mismatched_tallies()
+
+        self.tally += other.tally
+        self.n_ballots += other.n_ballots
+
+        return self
+
+    @property
+    def margins(self):
+        '''
+        Voting margins matrix (as described in `splitcycle`) of all
+        ballots tallied so far, identical to `margins_from_ballots` on
+        the concatenated ballots
+        '''
+        return self.tally.astype(float)
+
+    def winners(self, dfs=True, engine='search'):
+        '''
+        Return a sorted list of the SplitCycle winners so far (see
+        `splitcycle` for `dfs` and `engine`)
+        '''
+        return splitcycle(self.margins, dfs=dfs, engine=engine)
+
+
+class IncrementalCount:
+    '''
+    Live count that keeps the SplitCycle winners up to date as batches
+    of ballots arrive, and detects when they can no longer change
+
+    After each evaluation the count records how many further ballots
+    are guaranteed not to change the winners (see `stability_radius`).
+    New ballots only update the margins tally; the winners are
+    recomputed only once more ballots have arrived than that bound
+    allows, so batches that cannot affect the outcome cost nothing
+    beyond tallying.
+
+    Example:
+    >>> count = IncrementalCount(4)
+    >>> for batch in incoming_batches:
+    ...     count.add(batch)
+    ...     if count.is_locked(remaining=ballots_outstanding):
+    ...         publish(count.winners())
+    '''
+
+    def __init__(self, n_candidates, chunk_size=None):
+        '''
+        `n_candidates`:
+            the number of candidates ranked on every ballot
+
+        `chunk_size=None`:
+            number of ballots compared at once (see
+            `margins_from_ballots`)
+        '''
+        self.accumulator = MarginsAccumulator(n_candidates, chunk_size)
+        self.evaluations = 0  # number of times winners were recomputed
+        self._winners = []  # winners at the last evaluation
+        self._radius = -1  # ballots that cannot change `_winners`
+        self._pending = 0  # ballots tallied since the last evaluation
+
+    @property
+    def n_ballots(self):
+        '''Number of ballots tallied so far'''
+        return self.accumulator.n_ballots
+
+    @property
+    def margins(self):
+        '''Voting margins matrix of all ballots tallied so far'''
+        return self.accumulator.margins
+
+    def add(self, ballots):
+        '''
+        Add a batch of `ballots` (see `MarginsAccumulator.add`) to the
+        count
+
+        Returns the count itself to allow chaining
+        '''
+        before = self.accumulator.n_ballots
+        self.accumulator.add(ballots)
+        self._pending += self.accumulator.n_ballots - before
+
+        return self
+
+    def merge(self, other):
+        '''
+        Add the partial tally of `MarginsAccumulator` `other` (e.g. a
+        precinct counted elsewhere) to the count
+
+        Returns the count itself to allow chaining
+        '''
+        self.accumulator.merge(other)
+
+        # tallies rebuilt with `from_tally` may not know their number of
+        # ballots, but each ballot moves a margin by at most one
+        self._pending += max(
+            other.n_ballots, int(np.abs(other.tally).max(initial=0))
+        )
+
+        return self
+
+    def _evaluate(self):
+        '''Recompute the winners and how many ballots cannot change them'''
+        tally = self.accumulator.tally
+        strengths = strongest_paths(tally)
+        defeated = defeat_matrix(tally, strengths).any(axis=0)
+
+        self._winners = np.flatnonzero(~defeated).tolist()
+        self._radius = stability_radius(tally, strengths)
+        self._pending = 0
+        self.evaluations += 1
+
+    def winners(self):
+        '''Return a sorted list of the SplitCycle winners so far'''
+        if self._pending > self._radius:
+            self._evaluate()
+
+        return list(self._winners)
+
+    def is_locked(self, remaining):
+        '''
+        Return `True` if no way of casting at most `remaining` further
+        ballots can change the current SplitCycle winners
+        '''
+        if self._pending + remaining > self._radius:
+            self._evaluate()
+
+        return remaining <= self._radius
@@ -4,10 +4,11 @@ SplitCycle package
 '''
 
 from random import randint
+import numpy as np
 from tabulate import tabulate
 from .core import margins_from_ballots
 from .errors import not_enough_candidates
-from .models import ic, euclidean
+from .models import ic, euclidean, iac, urn, mallows, sample_margins
 
 
 def augment(ballots):
@@ -16,27 +17,30 @@ def augment(ballots):
     ranked candidates having positive rank, replace all unranked
     candidates (represented with negative rank) with a rank greater than
     that of the least preferred ranked candidate in that ballot.
-    '''
-    for i, ballot in enumerate(ballots):
-        last = -1  # keep track of last unranked candidate if needed
-        for j, rank in enumerate(ballot):
-            if rank < 0:
-                if last == -1:
-                    # store last unranked candidate if not already set
-                    last = max(ballot) + 1
 
-                # replace rank
-                ballots[i][j] = last
+    A numpy array of `ballots` is updated in place; other sequences are
+    converted to a new array. Returns the augmented ballots array
+    '''
+    ballots = np.asarray(ballots)
+    unranked = ballots < 0
+    if unranked.any():
+        # one more than the last rank of each ballot
+        last = np.broadcast_to(
+            ballots.max(axis=-1, keepdims=True) + 1, ballots.shape
+        )
+        ballots[unranked] = last[unranked]
 
     return ballots
 
 
-def info(ballots, candidates, verbose=True):
+def info(ballots, candidates, verbose=True, chunk_size=None):
     '''
-    Given preprocessed `ballots` and `candidates` objects (as described
-    in `elect`), return a dictionary of information about the election
-    to ensure all data was processed correctly. Turn off print output
-    with `verbose=False`.
+    Given preprocessed `ballots` (or a `Profile`) and `candidates`
+    objects (as described in `elect`), return a dictionary of
+    information about the election to ensure all data was processed
+    correctly. Turn off print output with `verbose=False`. `chunk_size`
+    bounds the number of ballots compared at once when building margins
+    (see `margins_from_ballots`).
     '''
     # check that all candidates are represented in `ballots`
     if ballots.shape[1] != len(candidates):
@@ -44,7 +48,7 @@ def info(ballots, candidates, verbose=True):
 
     n_candidates = len(candidates)
     n_ballots = ballots.shape[0]
-    margins = margins_from_ballots(ballots)
+    margins = margins_from_ballots(ballots, chunk_size)
 
     # pick an example ballot at random
     ex_ballot = ballots[randint(0, n_ballots - 1)]
@@ -84,7 +88,36 @@ def info(ballots, candidates, verbose=True):
     }
 
 
-def gen_random_ballots(n_ballots, n_candidates, model='ic-ties'):
+def parse_model(model):
+    '''
+    Return the ballot model function in `models` and its keyword
+    parameters for a voter preferences `model` name (see
+    `gen_random_ballots`)
+    '''
+    base_model, _, param = model.partition('-')
+    if base_model == 'ic':
+        return ic, {'ties': 'ties' in param}
+    if base_model == 'euclidean':
+        return euclidean, {'n': int(param)}
+    if base_model == 'iac':
+        return iac, {}
+    if base_model == 'urn':
+        return urn, {'replace': None if param == 'r' else int(param)}
+    if base_model in ('mallows', 'mallows2ref'):
+        return mallows, {
+            'relphi': None if param == 'r' else float(param),
+            'two_references': base_model == 'mallows2ref',
+        }
+
+    raise ValueError(
+        f'The specified voter preferences model `{model}` does not '
+        r'exist! Options are: `ic`, `ic-ties`, `euclidean-{n}`, `iac`, '
+        r'`urn-{replace}`, `urn-r`, `mallows-{relphi}`, `mallows-r`, '
+        r'`mallows2ref-{relphi}`, and `mallows2ref-r`.'
+    )
+
+
+def gen_random_ballots(n_ballots, n_candidates, model='ic-ties', rng=None):
     '''
     Generate a random set of ballots for testing purposes
 
@@ -111,23 +144,43 @@ def gen_random_ballots(n_ballots, n_candidates, model='ic-ties'):
               based on the ranking of the distance from their location
               to each candidate's location (shorter distances
               correspond to greater preference)
+        - `iac`: impartial anonymous culture
+            - every anonymous profile (number of voters casting each
+              ranking) is equally likely
+        - `urn-{replace}`: Polya-Eggenberger urn model
+            - each voter draws a ranking from an urn, and `replace`
+              copies of it are added to the urn; `urn-r` draws
+              `replace` at random (the `URN-R` model)
+        - `mallows-{relphi}`: Mallows model
+            - rankings concentrate around a random reference ranking
+              with normalized dispersion `relphi` between 0 and 1;
+              `mallows-r` draws `relphi` at random (the
+              `MALLOWS-RELPHI-R` model)
+        - `mallows2ref-{relphi}`: Mallows model with two references
+            - as `mallows-{relphi}`, but each voter follows the
+              reference ranking or its reverse with equal probability
+              (`mallows2ref-r` is the `MALLOWS_2REF-RELPHI-R` model)
+
+    `rng=None`:
+        seed or `np.random.Generator` to draw from
 
     Return a numpy array of shape (n_ballots, n_candidates) that
     represents a preprocessed list of ballots with ranks 1 to
     `n_candidates` (can be used with `elect`)
     '''
-    base_model = model.split('-')[0]
-    if base_model == 'ic':
-        ties = 'ties' in model
-        return ic(n_ballots, n_candidates, ties)
-    if base_model == 'euclidean':
-        n = int(model.split('-')[1])
-        return euclidean(n_ballots, n_candidates, n)
+    model, params = parse_model(model)
+    return model(n_ballots, n_candidates, rng=rng, **params)
 
-    raise ValueError(
-        f'The specified voter preferences model `{model}` does not '
-        r'exist! Options are: `ic`, `ic-ties`, and `euclidean-{n}`.'
-    )
+
+def gen_random_margins(n_ballots, n_candidates, model='ic-ties', rng=None):
+    '''
+    Generate the voting margins matrix (as described in `splitcycle`)
+    of a random election, with the same arguments as
+    `gen_random_ballots`, without generating every ballot when the
+    number of voters is large (see `models.sample_margins`)
+    '''
+    model, params = parse_model(model)
+    return sample_margins(n_ballots, n_candidates, model, rng, **params)
 
 
 def condorcet_index(preferences, round_number, candidate_score, total_votes):
@@ -0,0 +1,195 @@
+'''
+Checkable justifications of SplitCycle results
+
+`splitcycle_witnesses` returns the winners of an election along with a
+witness for every fact they rest on:
+
+- every loser `y` has a defeat `[x, y, reachable]`: `x` has a positive
+  margin `k` over `y`, and `reachable` is a set of candidates containing
+  `y` but not `x` with no edge of margin at least `k` leaving it, so no
+  path from `y` back to `x` is as strong as `k`
+- every winner `w` beaten head to head by some `y` has a split
+  `[y, w, path]`: a path from `w` to `y` whose margins are all at least
+  the margin of `y` over `w`, so that `y` does not defeat `w`
+
+`verify_witnesses` checks all of them with a few array reads per
+witness, without computing any strongest path, so third parties can
+confirm a result much faster than recomputing it. Witnesses are made of
+plain lists and integers and can be stored as JSON.
+
+Example:
+>>> witnesses = splitcycle_witnesses(margins)
+>>> witnesses['winners']
+>>> verify_witnesses(margins, witnesses)
+True
+'''
+
+import numpy as np
+from .core import is_margin_like
+from .errors import not_margin_like
+
+
+def strong_path(matrix, source, target, k):
+    '''
+    Breadth-first search for a path from `source` to `target` along
+    edges of `matrix` of weight at least `k`, one vectorized step per
+    level
+
+    Returns a tuple `(path, reachable)`: the path as a list of nodes
+    from `source` to `target` and `None` if there is one, otherwise
+    `None` and the sorted list of nodes reachable from `source`
+    '''
+    n = matrix.shape[0]
+    visited = np.zeros(n, dtype=bool)
+    visited[source] = True
+    parent = np.full(n, -1)
+    frontier = np.array([source])
+
+    while frontier.size and not visited[target]:
+        edges = (matrix[frontier, :] >= k) & ~visited
+        new = edges.any(axis=0)
+
+        # remember the first frontier node leading to each new node
+        parent[new] = frontier[edges[:, new].argmax(axis=0)]
+        visited |= new
+        frontier = np.flatnonzero(new)
+
+    if not visited[target]:
+        return None, np.flatnonzero(visited).tolist()
+
+    path = [int(target)]
+    while path[-1] != source:
+        path.append(int(parent[path[-1]]))
+
+    return path[::-1], None
+
+
+def splitcycle_witnesses(margins):
+    '''
+    Determine the SplitCycle winners of `margins` (as described in
+    `splitcycle`) along with witnesses justifying them (see module
+    documentation)
+
+    Returns a dictionary with the sorted list of `winners`, one defeat
+    per loser in `defeats` and every split of a winner in `splits`
+    '''
+    margins = np.asarray(margins)
+    if not is_margin_like(margins):
+        not_margin_like()
+
+    winners, defeats, splits = [], [], []
+    for a in range(margins.shape[0]):
+        beaters = np.flatnonzero(margins[:, a] > 0)
+
+        # strongest margins first, as they are the likeliest defeats
+        beaters = beaters[np.argsort(-margins[beaters, a], kind='stable')]
+        found = []
+        for b in beaters:
+            path, reachable = strong_path(margins, a, b, margins[b, a])
+            if path is None:
+                defeats.append([int(b), a, reachable])
+                break
+            found.append([int(b), a, path])
+        else:
+            winners.append(a)
+            splits.extend(found)
+
+    return {'winners': winners, 'defeats': defeats, 'splits': splits}
+
+
+def _candidates(values, n):
+    '''
+    Return the list `values` as an array of candidate indices, raising
+    `ValueError` unless they are all integers (not booleans) from 0 to
+    `n - 1`, as negative indices would silently wrap around
+    '''
+    if not all(
+        isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+        for value in values
+    ):
+        raise ValueError('candidates must be integers')
+
+    values = np.array(values, dtype=np.int64)
+    if ((values < 0) | (values >= n)).any():
+        raise ValueError('candidates must be from 0 to `n - 1`')
+
+    return values
+
+
+def _verify_defeat(margins, defeat):
+    '''Check a defeat `[x, y, reachable]` (see module documentation)'''
+    x, y, reachable = defeat
+    n = margins.shape[0]
+    x, y = _candidates([x, y], n)
+    reachable = _candidates(reachable, n)
+    inside = np.zeros(margins.shape[0], dtype=bool)
+    inside[reachable] = True
+    k = margins[x, y]
+
+    return bool(
+        k > 0 and inside[y] and not inside[x]
+        and not (margins[np.ix_(inside, ~inside)] >= k).any()
+    )
+
+
+def _verify_split(margins, split):
+    '''Check a split `[y, w, path]` (see module documentation)'''
+    y, w, path = split
+    y, w = _candidates([y, w], margins.shape[0])
+    path = _candidates(path, margins.shape[0])
+
+    return bool(
+        len(path) >= 2 and path[0] == w and path[-1] == y
+        and (margins[path[:-1], path[1:]] >= margins[y, w]).all()
+    )
+
+
+def verify_witnesses(margins, witnesses):
+    '''
+    Check `witnesses` (as returned by `splitcycle_witnesses`) against
+    `margins`: every loser has a valid defeat, and every winner has a
+    valid split for each candidate beating it head to head
+
+    Returns `True` if the witnesses prove that `witnesses['winners']`
+    are exactly the SplitCycle winners of `margins`, `False` otherwise
+    '''
+    margins = np.asarray(margins)
+    if not is_margin_like(margins):
+        not_margin_like()
+
+    try:
+        return _verify(margins, witnesses)
+    except (IndexError, KeyError, TypeError, ValueError):
+        # malformed witnesses prove nothing
+        return False
+
+
+def _verify(margins, witnesses):
+    '''Check `witnesses` as described in `verify_witnesses`'''
+    n = margins.shape[0]
+    claimed = _candidates(witnesses['winners'], n)
+    if (np.diff(claimed) <= 0).any():
+        # the winners are listed once each, in increasing order
+        return False
+    winners = np.zeros(n, dtype=bool)
+    winners[claimed] = True
+
+    # each loser needs a defeat
+    defeated = np.zeros(n, dtype=bool)
+    for x, y, reachable in witnesses['defeats']:
+        if not _verify_defeat(margins, (x, y, reachable)):
+            return False
+        defeated[y] = True
+    if (defeated == winners).any():
+        return False
+
+    # each winner needs a split for every candidate beating it
+    split = np.zeros((n, n), dtype=bool)
+    for y, w, path in witnesses['splits']:
+        if not _verify_split(margins, (y, w, path)):
+            return False
+        split[y, w] = True
+
+    beats = margins[:, winners] > 0
+
+    return bool((split[:, winners] | ~beats).all())
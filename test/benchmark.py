@@ -0,0 +1,197 @@
+'''
+Benchmark suite for the SplitCycle package
+
+Sweeps candidate counts, voter counts, voter preferences models and
+search engines, timing margin building (`margins_from_ballots`) and
+winner finding (`splitcycle`) separately. Worker pools are started
+before timing, so results reflect steady-state calls. Results are
+written as JSON or CSV and can be compared against a stored baseline
+to catch performance regressions before release:
+
+    python test/benchmark.py --output results.csv
+    python test/benchmark.py --compare test/benchmark_baseline.json
+    python test/benchmark.py --save-baseline test/benchmark_baseline.json
+
+Baseline timings are machine dependent; regenerate the baseline when
+benchmarking on different hardware.
+'''
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import product
+import numpy as np
+import splitcycle
+from splitcycle.core import margins_from_ballots
+
+CANDIDATES = [5, 10, 20, 50]
+VOTERS = [101, 1001, 10001]
+MODELS = ['ic', 'euclidean-2', 'mallows-r', 'urn-r']
+ENGINES = {
+    'dfs': {'dfs': True},
+    'bfs': {'dfs': False},
+    'widest-path': {'engine': 'widest-path'},
+}
+TRIALS = 5
+
+# slowdown factor (and absolute slack) beyond which a result counts as a
+# regression against the baseline
+TOLERANCE = 1.5
+SLACK_MS = 0.5
+
+FIELDS = [
+    'n_candidates', 'n_voters', 'model', 'engine', 'trials',
+    'margins_ms', 'winners_ms',
+]
+
+
+def timed(function, *args, **kwargs):
+    '''Return the result of calling `function` and the time taken in ms'''
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, 1000 * (time.perf_counter() - start)
+
+
+def measure(n_candidates, n_voters, model, args, executor):
+    '''
+    Time margin building and every engine in `args.engines` on
+    `args.trials` random elections of the given shape
+
+    Returns a list of result rows (dictionaries with keys `FIELDS`)
+    with the median times, one per engine
+    '''
+    margins_times = []
+    winners_times = {engine: [] for engine in args.engines}
+
+    for trial in range(args.trials):
+        ballots = splitcycle.utils.gen_random_ballots(
+            n_voters, n_candidates, model, rng=trial
+        )
+        margins, elapsed = timed(margins_from_ballots, ballots)
+        margins_times.append(elapsed)
+
+        for engine, times in winners_times.items():
+            _, elapsed = timed(
+                splitcycle.splitcycle, margins, executor=executor,
+                **ENGINES[engine],
+            )
+            times.append(elapsed)
+
+    return [
+        {
+            'n_candidates': n_candidates,
+            'n_voters': n_voters,
+            'model': model,
+            'engine': engine,
+            'trials': args.trials,
+            'margins_ms': float(np.median(margins_times)),
+            'winners_ms': float(np.median(times)),
+        }
+        for engine, times in winners_times.items()
+    ]
+
+
+def run(args, executor):
+    '''
+    Time every combination of the sweep parameters in `args`
+
+    Returns a list of result rows (dictionaries with keys `FIELDS`)
+    '''
+    rows = []
+    for n_candidates, n_voters, model in product(
+            args.candidates, args.voters, args.models
+        ):
+        results = measure(n_candidates, n_voters, model, args, executor)
+        rows.extend(results)
+        print(
+            f'{n_candidates:>4} candidates {n_voters:>6} voters {model:<12}'
+            + ''.join(
+                f' {row["engine"]}: {row["winners_ms"]:.3f} ms'
+                for row in results
+            )
+            + f' (margins: {results[0]["margins_ms"]:.3f} ms)',
+            file=sys.stderr,
+        )
+
+    return rows
+
+
+def write(rows, path):
+    '''Write result `rows` to `path` as CSV or (otherwise) JSON'''
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        if path.endswith('.csv'):
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, file, indent=1)
+
+
+def compare(rows, path, tolerance):
+    '''
+    Compare result `rows` with the baseline results stored at `path`
+
+    Returns a list of descriptions of the regressions found
+    '''
+    with open(path, encoding='utf-8') as file:
+        baseline = {
+            (row['n_candidates'], row['n_voters'], row['model'],
+             row['engine']): row
+            for row in json.load(file)
+        }
+
+    regressions = []
+    for row in rows:
+        key = (row['n_candidates'], row['n_voters'], row['model'],
+               row['engine'])
+        if key not in baseline:
+            continue
+        for field in ('margins_ms', 'winners_ms'):
+            new, old = row[field], baseline[key][field]
+            if new > old * tolerance and new - old > SLACK_MS:
+                regressions.append(
+                    f'{key}: {field} {old:.3f} ms -> {new:.3f} ms'
+                )
+
+    return regressions
+
+
+def main():
+    '''Run the benchmark suite from the command line'''
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n', maxsplit=1)[0])
+    parser.add_argument('--candidates', type=int, nargs='+',
+                        default=CANDIDATES)
+    parser.add_argument('--voters', type=int, nargs='+', default=VOTERS)
+    parser.add_argument('--models', nargs='+', default=MODELS)
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES),
+                        default=list(ENGINES))
+    parser.add_argument('--trials', type=int, default=TRIALS)
+    parser.add_argument('--output', help='write results (.json or .csv)')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='fail if slower than this JSON baseline')
+    parser.add_argument('--save-baseline', metavar='BASELINE',
+                        help='store results as the JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    with splitcycle.SplitCycleEngine() as executor:
+        # start the worker pool before timing anything
+        executor.pool.map(abs, range(executor.processes))
+        rows = run(args, executor)
+
+    if args.output:
+        write(rows, args.output)
+    if args.save_baseline:
+        write(rows, args.save_baseline)
+    if args.compare:
+        regressions = compare(rows, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+'''
+Random elections and a reference implementation for the randomized
+checks in this directory
+
+`reference_winners` follows the definition of Split Cycle directly, one
+depth-first strong path search per losing pair of candidates, as the
+package did before any of its engines and shortcuts were added.
+'''
+
+import numpy as np
+from splitcycle.core import has_strong_path_dfs, margins_from_ballots
+
+
+def random_elections(seed, trials=300, sizes=(2, 9), voters=(1, 12)):
+    '''
+    Yield the margins of `trials` random elections with a number of
+    candidates and voters drawn from the half-open ranges `sizes` and
+    `voters`; few voters make ties and cycles likely
+    '''
+    rng = np.random.default_rng(seed)
+    for _ in range(trials):
+        n = int(rng.integers(*sizes))
+        ballots = np.argsort(rng.random((int(rng.integers(*voters)), n)), 1)
+        yield margins_from_ballots(ballots + 1)
+
+
+def reference_defeats(margins):
+    '''Boolean matrix of the Split Cycle defeats of `margins`'''
+    n = margins.shape[0]
+    defeats = np.zeros((n, n), dtype=bool)
+    for x in range(n):
+        for y in range(n):
+            defeats[x, y] = margins[x, y] > 0 and not has_strong_path_dfs(
+                margins, y, x, margins[x, y]
+            )
+
+    return defeats
+
+
+def reference_winners(margins):
+    '''Sorted list of the Split Cycle winners of `margins`'''
+    return np.flatnonzero(
+        ~reference_defeats(margins).any(axis=0)
+    ).tolist()
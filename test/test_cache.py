@@ -0,0 +1,93 @@
+'''Winner cache eviction, persistence and election keys'''
+
+import os
+import tempfile
+import numpy as np
+from elections import random_elections
+from splitcycle.cache import ENTRY_BYTES, WinnerCache, election_key
+from splitcycle.core import splitcycle
+
+
+def test_max_entries():
+    '''The least recently used entries are evicted first'''
+    cache = WinnerCache(max_entries=2)
+    cache.put('a', [0])
+    cache.put('b', [1])
+    assert cache.get('a') == [0]  # now more recent than 'b'
+    cache.put('c', [2])
+    assert len(cache) == 2
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('a') == [0] and cache.get('c') == [2]
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_max_bytes():
+    '''Entries are evicted over the memory budget, keeping the newest'''
+    cache = WinnerCache(max_bytes=2 * ENTRY_BYTES + 8 * 3)
+    cache.put('a', [0])
+    cache.put('b', [1, 2])
+    assert cache.nbytes == 2 * ENTRY_BYTES + 8 * 3
+    cache.put('c', [3])
+    assert len(cache) == 2 and 'a' not in cache
+    assert cache.nbytes == 2 * ENTRY_BYTES + 8 * 3
+
+    # an entry over budget on its own is still kept
+    cache.put('d', list(range(100)))
+    assert len(cache) == 1 and cache.get('d') == list(range(100))
+    assert cache.nbytes == ENTRY_BYTES + 8 * 100
+
+
+def test_put_again():
+    '''Putting a key again replaces its entry and its size'''
+    cache = WinnerCache()
+    cache.put('a', [0, 1, 2])
+    cache.put('a', [0])
+    assert len(cache) == 1 and cache.get('a') == [0]
+    assert cache.nbytes == ENTRY_BYTES + 8
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_directory():
+    '''Entries cleared from memory are reloaded from the directory'''
+    directory = tempfile.mkdtemp()
+    cache = WinnerCache(max_entries=1, directory=directory)
+    cache.put('a', [0, 2])
+    cache.put('b', [1])
+    assert len(cache) == 1 and 'a' in cache
+    assert cache.get('a') == [0, 2]
+
+    cache.clear()
+    assert len(cache) == 0
+    reopened = WinnerCache(directory=directory)
+    assert reopened.get('b') == [1] and len(reopened) == 1
+    assert (reopened.hits, reopened.misses) == (1, 0)
+
+    cache.clear(disk=True)
+    assert not os.listdir(directory)
+    assert cache.get('a') is None and 'b' not in cache
+
+
+def test_election_key():
+    '''Keys depend on the values of the margins, not their dtype'''
+    margins = [[0, 3, -1], [-3, 0, 5], [1, -5, 0]]
+    key = election_key(margins)
+    for dtype in (np.int8, np.int32, np.int64, np.float32, np.float64):
+        assert election_key(np.array(margins, dtype=dtype)) == key
+
+    assert election_key(np.array(margins) / 2) != key
+    assert election_key(margins, candidates=[0, 1]) != key
+    assert election_key(margins, engine='widest-path') != key
+    assert election_key(margins, candidates=[0, 1]) != \
+        election_key(margins, candidates=[0, 2])
+
+
+def test_cached_winners():
+    '''Cached winners are the ones computed, however margins are stored'''
+    cache = WinnerCache()
+    for margins in random_elections(8, trials=50):
+        winners = splitcycle(margins, cache=cache)
+        assert splitcycle(margins.astype(float), cache=cache) == winners
+        assert splitcycle(margins, cache=cache) == winners
+    assert cache.hits == 100 and cache.misses <= 50
@@ -0,0 +1,76 @@
+'''Checks of the `splitcycle` command on temporary input files'''
+
+import io
+import os
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+import numpy as np
+from elections import random_elections, reference_winners
+from splitcycle.cli import main
+from splitcycle.storage import write_ballots
+
+
+def run(*argv):
+    '''Return the exit status and output of the command with `argv`'''
+    output, errors = io.StringIO(), io.StringIO()
+    with redirect_stdout(output), redirect_stderr(errors):
+        try:
+            status = main(list(argv))
+        except SystemExit as exit_:
+            status = exit_.code
+
+    return status, output.getvalue() + errors.getvalue()
+
+
+def write(text):
+    '''Write `text` to a new temporary file and return its path'''
+    descriptor, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+        file.write(text)
+
+    return path
+
+
+def test_ballots():
+    '''Text and binary ballots give the same named winners'''
+    path = write('# comment\n1 2 3\n\n2,1,3\n3 1 2\n')
+    assert run(path) == (0, '1\n')
+    assert run('-c', 'A,B,C', '-e', 'widest-path', path) == (0, 'B\n')
+    assert run('--bfs', path, path) == (0, '1\n')
+
+    binary = os.path.join(tempfile.mkdtemp(), 'election.ballots')
+    write_ballots(binary, [[1, 2, 3], [2, 1, 3], [3, 1, 2]])
+    assert run('-c', 'A,B,C', binary, path) == (0, 'B\n')
+
+
+def test_margins():
+    '''Margins files give the reference winners'''
+    for margins in random_elections(17, trials=30):
+        path = write('\n'.join(
+            ' '.join(str(int(margin)) for margin in row) for row in margins
+        ))
+        expected = ''.join(f'{w}\n' for w in reference_winners(margins))
+        assert run('--margins', path) == (0, expected)
+
+
+def test_errors():
+    '''Bad input exits with status 1 and an error message'''
+    for argv, message in (
+        ([write('1 2\n1 2 3\n')], 'one entry per candidate'),
+        (['-c', 'A,B', write('1 2 3\n')], '2 candidate names'),
+        ([write('# nothing\n')], 'no ballots'),
+        (['--margins', write('')], 'square matrix'),
+        ([os.path.join(tempfile.mkdtemp(), 'missing.txt')], 'No such file'),
+    ):
+        status, output = run(*argv)
+        assert status == 1
+        assert message in output
+        assert output.startswith('splitcycle: error:')
+
+
+def test_large_margins():
+    '''A larger margins file round trips through the text format'''
+    margins = np.zeros((40, 40), dtype=int)
+    margins[0, 1:], margins[1:, 0] = 1, -1
+    path = write('\n'.join(','.join(map(str, row)) for row in margins))
+    assert run('--margins', '-e', 'widest-path', path) == (0, '0\n')
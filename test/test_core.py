@@ -0,0 +1,93 @@
+'''Randomized checks of `splitcycle` against the reference search'''
+
+import numpy as np
+from elections import random_elections, reference_defeats, \
+    reference_winners
+from splitcycle.core import MarginMatrix, smith_set, splitcycle, \
+    splitcycle_batch
+
+
+def test_engines():
+    '''Every engine agrees with the reference search'''
+    for margins in random_elections(13):
+        expected = reference_winners(margins)
+        assert splitcycle(margins) == expected
+        assert splitcycle(margins, dfs=False) == expected
+        assert splitcycle(margins, engine='widest-path') == expected
+
+
+def test_batch():
+    '''Stacks of elections of every size match the reference search'''
+    elections = list(random_elections(50, trials=400, sizes=(1, 8)))
+    for n in range(1, 8):
+        stack = [margins for margins in elections if len(margins) == n]
+        winners = splitcycle_batch(np.reshape(stack, (-1, n, n)))
+        assert winners.shape == (len(stack), n)
+        assert [np.flatnonzero(row).tolist() for row in winners] == [
+            reference_winners(margins) for margins in stack
+        ]
+
+
+def test_margin_matrix():
+    '''A `MarginMatrix` answers from its cached defeats'''
+    for margins in random_elections(130, trials=100):
+        matrix = MarginMatrix(margins)
+        expected = reference_winners(margins)
+        assert splitcycle(matrix) == expected
+        assert matrix.winners() == expected
+        assert np.array_equal(matrix.defeats, reference_defeats(margins))
+        assert splitcycle(matrix, engine='widest-path') == expected
+
+
+def test_margin_matrix_candidates():
+    '''Defeats by a subset of candidates only match the reference'''
+    for margins in random_elections(131, trials=100):
+        n = margins.shape[0]
+        candidates = list(range(0, n, 2))
+        expected = np.flatnonzero(
+            ~reference_defeats(margins)[candidates, :].any(axis=0)
+        ).tolist()
+        assert splitcycle(MarginMatrix(margins), candidates) == expected
+        assert splitcycle(margins, candidates) == expected
+
+
+def reference_smith_set(margins):
+    '''
+    Smith set of `margins` as the candidates reaching every other one
+    through non-losses, by transitive closure
+    '''
+    reach = margins >= 0
+    for k in range(margins.shape[0]):
+        reach |= reach[:, [k]] & reach[[k], :]
+
+    return np.flatnonzero(reach.all(axis=1)).tolist()
+
+
+def test_smith_set():
+    '''The prefix sum Smith set matches the transitive closure'''
+    for margins in random_elections(14, sizes=(2, 30), voters=(1, 40)):
+        assert smith_set(margins) == reference_smith_set(margins)
+        expected = reference_winners(margins)
+        assert splitcycle(margins, fast_path=False) == expected
+        assert splitcycle(margins) == expected
+
+
+def test_empty_election():
+    '''An election without candidates has no winners'''
+    empty = np.zeros((0, 0))
+    assert not smith_set(empty)
+    assert not splitcycle(empty)
+    assert not splitcycle(empty, engine='widest-path')
+    assert not splitcycle(MarginMatrix(empty))
+
+
+def test_margin_matrix_smith_set():
+    '''A `MarginMatrix` caches its defeats when its Smith set is small'''
+    margins = np.zeros((6, 6))
+    margins[:3, 3:] = 1  # a cycle of three beating everyone else
+    margins[[0, 1, 2], [1, 2, 0]] = 1
+    margins -= margins.T
+    matrix = MarginMatrix(margins)
+    assert splitcycle(matrix) == [0, 1, 2]
+    assert matrix._defeats is not None  # pylint: disable=protected-access
+    assert np.array_equal(matrix.defeats, reference_defeats(margins))
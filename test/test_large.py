@@ -0,0 +1,37 @@
+'''Randomized checks of the large-candidate mode'''
+
+import numpy as np
+from elections import random_elections, reference_winners
+from splitcycle.large import TriangularMargins, components, \
+    splitcycle_large
+
+
+def test_splitcycle_large():
+    '''Dense and triangular margins agree with the reference search'''
+    for margins in random_elections(15, sizes=(1, 20)):
+        expected = reference_winners(margins)
+        assert splitcycle_large(margins) == expected
+        triangular = TriangularMargins.from_dense(margins)
+        assert np.array_equal(triangular.to_dense(), margins)
+        assert splitcycle_large(triangular, row_bytes=64) == expected
+
+
+def test_components():
+    '''Components are the classes of mutual reachability'''
+    for margins in random_elections(150, sizes=(1, 20)):
+        reach = margins > 0
+        np.fill_diagonal(reach, True)
+        for k in range(margins.shape[0]):
+            reach |= reach[:, [k]] & reach[[k], :]
+
+        labels = components(margins)
+        same = labels[:, np.newaxis] == labels[np.newaxis, :]
+        assert np.array_equal(same, reach & reach.T)
+
+
+def test_ordered_acyclic():
+    '''An acyclic majority graph in index order splits into singletons'''
+    margins = np.triu(np.ones((300, 300)), 1)
+    margins -= margins.T
+    assert len(np.unique(components(margins))) == 300
+    assert splitcycle_large(margins) == [0]
@@ -0,0 +1,55 @@
+'''Randomized checks of the other voting methods against direct ones'''
+
+from elections import random_elections, reference_winners
+from splitcycle.core import MarginMatrix
+from splitcycle.methods import beat_path, compare_methods, copeland
+
+
+def schulze_winners(margins):
+    '''Beat Path winners by the Floyd-Warshall strongest path algorithm'''
+    n = margins.shape[0]
+    strength = [
+        [max(margins[x, y], 0) if x != y else 0 for y in range(n)]
+        for x in range(n)
+    ]
+    for k in range(n):
+        for x in range(n):
+            for y in range(n):
+                if len({x, y, k}) == 3:
+                    strength[x][y] = max(
+                        strength[x][y], min(strength[x][k], strength[k][y])
+                    )
+
+    return [
+        x for x in range(n)
+        if all(strength[x][y] >= strength[y][x] for y in range(n))
+    ]
+
+
+def copeland_scores(margins):
+    '''Pairwise wins minus pairwise losses of every candidate'''
+    n = margins.shape[0]
+    return [
+        sum(int(margins[x, y] > 0) - int(margins[x, y] < 0) for y in range(n))
+        for x in range(n)
+    ]
+
+
+def test_methods():
+    '''Every method matches its direct implementation'''
+    for margins in random_elections(24):
+        scores = copeland_scores(margins)
+        expected = {
+            'splitcycle': reference_winners(margins),
+            'beat_path': schulze_winners(margins),
+            'copeland': [
+                x for x, score in enumerate(scores) if score == max(scores)
+            ],
+        }
+        assert compare_methods(margins) == expected
+        assert compare_methods(MarginMatrix(margins)) == expected
+        assert beat_path(margins) == expected['beat_path']
+        assert copeland(margins) == expected['copeland']
+
+        # every Beat Path winner is a Split Cycle winner
+        assert set(expected['beat_path']) <= set(expected['splitcycle'])
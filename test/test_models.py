@@ -0,0 +1,82 @@
+'''Checks of the random voter models and of sampling margins directly'''
+
+import numpy as np
+from splitcycle import models
+from splitcycle.core import margins_from_ballots
+from splitcycle.utils import gen_random_ballots, gen_random_margins
+
+MODELS = (
+    'ic', 'ic-ties', 'euclidean-2', 'iac', 'urn-10', 'urn-r',
+    'mallows-0.5', 'mallows-r', 'mallows2ref-0.3', 'mallows2ref-r',
+)
+
+
+def test_valid_ranks():
+    '''Every model casts valid ballots, reproducibly from a seed'''
+    for model in MODELS:
+        for n in (1, 2, 5):
+            ballots = gen_random_ballots(200, n, model, rng=10)
+            assert ballots.shape == (200, n)
+            if model == 'ic-ties':
+                assert ((ballots >= 1) & (ballots <= n)).all()
+            else:
+                assert (np.sort(ballots, axis=1) == np.arange(1, n + 1)).all()
+
+            assert np.array_equal(
+                ballots, gen_random_ballots(200, n, model, rng=10)
+            )
+            assert np.array_equal(
+                gen_random_margins(200, n, model, rng=11),
+                gen_random_margins(200, n, model, rng=11),
+            )
+
+
+def test_mallows_frequencies():
+    '''Repeated insertion draws rankings with the Mallows probabilities'''
+    rankings = models._all_rankings(4)  # pylint: disable=protected-access
+    for two_references in (False, True):
+        # pylint: disable-next=protected-access
+        sample, probabilities = models._mallows_sampler(
+            4, 0.5, two_references, np.random.default_rng(12)
+        )
+        ballots = sample(60000)
+        frequencies = [
+            np.count_nonzero((ballots == ranking).all(axis=1)) / 60000
+            for ranking in rankings
+        ]
+        assert np.allclose(
+            frequencies, probabilities(rankings), atol=0.01
+        )
+
+
+def test_iac_profiles():
+    '''Under IAC, the four splits of three voters are equally likely'''
+    rng = np.random.default_rng(13)
+    for draw in (
+        lambda: margins_from_ballots(models.iac(3, 2, rng))[0, 1],
+        lambda: models.sample_margins(3, 2, models.iac, rng)[0, 1],
+    ):
+        margins = np.array([draw() for _ in range(8000)])
+        frequencies = [np.mean(margins == m) for m in (-3, -1, 1, 3)]
+        assert np.allclose(frequencies, 0.25, atol=0.02)
+
+
+def test_sample_margins_paths():
+    '''Multinomial and chunked sampling agree in distribution'''
+    def statistics(rng):
+        # sorted absolute margins do not depend on the random reference
+        return np.mean([
+            np.sort(np.abs(models.sample_margins(
+                50, 4, models.mallows, rng, relphi=0.4
+            )[np.triu_indices(4, 1)]))
+            for _ in range(1000)
+        ], axis=0)
+
+    multinomial = statistics(np.random.default_rng(14))
+    maximum, models.MAX_RANKINGS = models.MAX_RANKINGS, 0
+    try:
+        chunked = statistics(np.random.default_rng(15))
+    finally:
+        models.MAX_RANKINGS = maximum
+
+    assert np.allclose(multinomial, chunked, rtol=0.05)
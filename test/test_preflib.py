@@ -0,0 +1,131 @@
+'''Checks of the PrefLib readers on small hand-checked files'''
+
+import io
+import numpy as np
+from splitcycle.preflib import read_preflib
+from splitcycle.utils import augment
+
+CURRENT = {
+    'soc': '''# FILE NAME: example.soc
+# DATA TYPE: soc
+# NUMBER ALTERNATIVES: 3
+# ALTERNATIVE NAME 1: Alice
+# ALTERNATIVE NAME 2: Bob
+# ALTERNATIVE NAME 3: Carol
+3: 1,2,3
+2: 3,1,2
+1: 1,2,3
+''',
+    'soi': '''# DATA TYPE: soi
+# NUMBER ALTERNATIVES: 4
+# ALTERNATIVE NAME 2: Bob
+4: 2,1
+1: 3
+2: 4,3,2,1
+''',
+    'toc': '''# DATA TYPE: toc
+# NUMBER ALTERNATIVES: 3
+12: 1,{2,3}
+5: 3,1,2
+1: {1, 2, 3}
+''',
+}
+
+LEGACY = {
+    'soc': '''3
+1,Alice
+2,Bob
+3,Carol
+6,6,2
+3,1,2,3
+2,3,1,2
+1,1,2,3
+''',
+    'soi': '''4
+1,1
+2,Bob
+3,3
+4,4
+7,7,3
+4,2,1
+1,3
+2,4,3,2,1
+''',
+    'toc': '''3
+1,1
+2,2
+3,3
+18,18,3
+12,1,{2,3}
+5,3,1,2
+1,{1,2,3}
+''',
+}
+
+# ballots (as described in `elect`) and counts of every file above
+EXPECTED = {
+    'soc': ({(1, 2, 3): 4, (2, 3, 1): 2}, ['Alice', 'Bob', 'Carol']),
+    'soi': (
+        {(2, 1, 3, 3): 4, (2, 2, 1, 2): 1, (4, 3, 2, 1): 2},
+        ['1', 'Bob', '3', '4'],
+    ),
+    'toc': ({(1, 2, 2): 12, (2, 3, 1): 5, (1, 1, 1): 1}, ['1', '2', '3']),
+}
+
+
+def ballot_counts(profile):
+    '''Map every ballot of `profile` to its number of voters'''
+    counts = {}
+    for ranking, count in zip(profile.rankings, profile.counts):
+        counts[tuple(ranking.tolist())] = counts.get(
+            tuple(ranking.tolist()), 0
+        ) + int(count)
+
+    return counts
+
+
+def test_read_preflib():
+    '''Both formats give the hand-built profiles, batched or not'''
+    for kind, (counts, names) in EXPECTED.items():
+        for text in (CURRENT[kind], LEGACY[kind]):
+            for batch_orders in (1, 2, 10000):
+                profile, candidates = read_preflib(
+                    io.StringIO(text), batch_orders
+                )
+                assert ballot_counts(profile) == counts
+                assert candidates == names
+
+
+def test_no_orders():
+    '''A file without orders gives an empty profile'''
+    profile, candidates = read_preflib(
+        io.StringIO('# DATA TYPE: soc\n# NUMBER ALTERNATIVES: 2\n')
+    )
+    assert profile.n_ballots == 0
+    assert profile.rankings.shape == (0, 2)
+    assert candidates == ['1', '2']
+
+
+def augment_loop(ballots):
+    '''`augment` as it was written before it was vectorized'''
+    for i, ballot in enumerate(ballots):
+        last = -1
+        for j, rank in enumerate(ballot):
+            if rank < 0:
+                if last == -1:
+                    last = max(ballot) + 1
+                ballots[i][j] = last
+
+    return ballots
+
+
+def test_augment():
+    '''Vectorized `augment` matches the original loop'''
+    rng = np.random.default_rng(18)
+    for _ in range(200):
+        n = int(rng.integers(1, 7))
+        ballots = np.argsort(rng.random((int(rng.integers(1, 9)), n)), 1) + 1
+        ballots[rng.random(ballots.shape) < 0.4] = -1
+        expected = augment_loop(ballots.tolist())
+        assert np.array_equal(augment(ballots.tolist()), expected)
+        assert np.array_equal(augment(ballots), expected)
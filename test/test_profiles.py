@@ -0,0 +1,80 @@
+'''Randomized checks of compressed ballots against counting by hand'''
+
+import numpy as np
+from splitcycle.core import margins_from_ballots, pairwise_wins
+from splitcycle.profiles import Profile, TopKBallots
+from splitcycle.tally import MarginsAccumulator
+
+
+def count_wins(ballots, n_candidates, counts):
+    '''
+    Pairwise wins of truncated `ballots` (lists of ranked candidates,
+    unranked candidates tied last), one pair at a time
+    '''
+    wins = np.zeros((n_candidates, n_candidates), dtype=np.int64)
+    for ballot, count in zip(ballots, counts):
+        unranked = set(range(n_candidates)) - set(ballot)
+        for i, winner in enumerate(ballot):
+            for loser in list(ballot[i + 1:]) + sorted(unranked):
+                wins[winner, loser] += count
+
+    return wins
+
+
+def test_top_k_ballots():
+    '''Sparse tallies match counting by hand and the dense ballots'''
+    rng = np.random.default_rng(23)
+    for _ in range(200):
+        n = int(rng.integers(1, 12))
+        ballots = [
+            rng.permutation(n)[:int(rng.integers(0, n + 1))].tolist()
+            for _ in range(int(rng.integers(0, 30)))
+        ]
+        counts = rng.integers(0, 4, len(ballots))
+        sparse = TopKBallots.from_lists(ballots, n, counts)
+        expected = count_wins(ballots, n, counts)
+
+        assert np.array_equal(pairwise_wins(sparse), expected)
+        chunk_size = int(rng.integers(1, 5))
+        assert np.array_equal(sparse.pairwise_wins(chunk_size), expected)
+        if ballots:
+            dense = sparse.expand()
+            assert np.array_equal(pairwise_wins(dense), expected)
+            assert np.array_equal(
+                margins_from_ballots(sparse), margins_from_ballots(dense)
+            )
+            assert np.array_equal(
+                MarginsAccumulator(n).add(sparse).tally,
+                expected - expected.T,
+            )
+
+
+def test_invalid_top_k_ballots():
+    '''Out of range or repeated candidates are rejected'''
+    for ballots in ([[0, 3]], [[1, -1]], [[0, 1, 0]], [[2], [1, 2, 2]]):
+        lengths = [len(ballot) for ballot in ballots]
+        try:
+            TopKBallots(
+                np.concatenate(ballots), np.cumsum([0] + lengths), 3
+            )
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'{ballots} were accepted')
+
+    # the same candidate on different ballots is fine
+    sparse = TopKBallots.from_lists([[0, 1], [1, 0], [], [2, 0, 1]], 3)
+    assert sparse.n_ballots == 4
+
+
+def test_profile():
+    '''Grouping identical ballots leaves the margins unchanged'''
+    rng = np.random.default_rng(8)
+    for _ in range(100):
+        n = int(rng.integers(2, 6))
+        ballots = np.argsort(rng.random((int(rng.integers(1, 60)), n)), 1)
+        profile = Profile.from_ballots(ballots + 1)
+        assert profile.n_ballots == len(ballots)
+        assert np.array_equal(
+            margins_from_ballots(profile), margins_from_ballots(ballots + 1)
+        )
@@ -0,0 +1,28 @@
+'''Randomized checks of Split Cycle rankings against the reference'''
+
+import numpy as np
+from elections import random_elections, reference_defeats, \
+    reference_winners
+from splitcycle.core import MarginMatrix, splitcycle
+from splitcycle.ranking import splitcycle_ranking
+
+
+def test_ranking():
+    '''Tiers are the candidates undefeated by the remaining ones'''
+    for margins in random_elections(22):
+        tiers = splitcycle_ranking(margins)
+        assert tiers == splitcycle_ranking(MarginMatrix(margins))
+        assert tiers[0] == reference_winners(margins)
+        assert sorted(sum(tiers, [])) == list(range(margins.shape[0]))
+
+        defeats = reference_defeats(margins)
+        remaining = np.ones(margins.shape[0], dtype=bool)
+        for tier in tiers:
+            undefeated = ~defeats[remaining].any(axis=0) & remaining
+            assert tier == np.flatnonzero(undefeated).tolist()
+            considered = np.flatnonzero(remaining).tolist()
+            assert tier == [
+                winner for winner in splitcycle(margins, considered)
+                if remaining[winner]
+            ]
+            remaining[tier] = False
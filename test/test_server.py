@@ -0,0 +1,84 @@
+'''Checks of the local server and of engines shared between threads'''
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+from elections import random_elections, reference_winners
+from splitcycle import server as server_module
+from splitcycle.core import SplitCycleEngine
+from splitcycle.server import SplitCycleServer
+
+
+def test_engine_threads():
+    '''Threads sharing an engine start a single pool'''
+    margins = next(random_elections(19, trials=1, sizes=(30, 31)))
+    results = []
+    with SplitCycleEngine(processes=2, serial_threshold=5) as engine:
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(engine.run(margins, range(30)))
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(multiprocessing.active_children()) == 2
+
+    assert results == [reference_winners(margins)] * 4
+
+
+def test_undecodable_request():
+    '''A line that is not UTF-8 is answered and the connection kept'''
+    path = os.path.join(tempfile.mkdtemp(), 'splitcycle.sock')
+    server = SplitCycleServer(SplitCycleEngine(processes=1))
+    threading.Thread(
+        target=lambda: asyncio.run(server.serve(path)), daemon=True
+    ).start()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        for _ in range(100):
+            try:
+                client.connect(path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                threading.Event().wait(0.05)
+        client.sendall(b'\xff\xfe\n{"margins": [[0, 1], [-1, 0]]}\n')
+        with client.makefile('rb') as responses:
+            assert b'JSON' in responses.readline()
+            assert b'"winners": [0]' in responses.readline()
+
+
+def test_failed_batch():
+    '''A failed batch, even with cancelled requests, spares later ones'''
+    batch = server_module.splitcycle_batch
+    margins = [[0, 1], [-1, 0]]
+
+    def fail(_):
+        server_module.splitcycle_batch = batch
+        raise RuntimeError('batch failed')
+
+    async def requests():
+        server = SplitCycleServer(SplitCycleEngine(processes=1))
+        server_module.splitcycle_batch = fail
+        cancelled = asyncio.ensure_future(server.evaluate(margins))
+        failed = asyncio.ensure_future(server.evaluate(margins))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        try:
+            await asyncio.wait_for(failed, 5)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('the failed batch returned winners')
+
+        return await asyncio.wait_for(server.evaluate(margins), 5)
+
+    try:
+        assert asyncio.run(requests()) == [0]
+    finally:
+        server_module.splitcycle_batch = batch
@@ -0,0 +1,77 @@
+'''Checks of the arrays shared with worker processes'''
+
+import threading
+import time
+import numpy as np
+from elections import random_elections, reference_winners
+from splitcycle import shared
+from splitcycle.core import SplitCycleEngine, margins_from_ballots, \
+    splitcycle
+
+
+def attached(_):
+    '''Number of segments attached by the worker running this task'''
+    return len(shared._ATTACHED)  # pylint: disable=protected-access
+
+
+def test_release_workers():
+    '''Workers release shared margins and ballots after each call'''
+    margins = next(random_elections(20, trials=1, sizes=(100, 101)))
+    ballots = np.argsort(np.random.default_rng(20).random((4000, 8)), 1)
+    assert margins.nbytes >= shared.SHARED_BYTES
+    assert ballots.nbytes >= shared.SHARED_BYTES
+
+    with SplitCycleEngine(processes=2, serial_threshold=5) as engine:
+        assert engine.run(margins, range(100)) == reference_winners(margins)
+        assert not any(engine.pool.map(attached, range(8), chunksize=1))
+
+        expected = margins_from_ballots(ballots)
+        assert np.array_equal(engine.tally(ballots), expected)
+        assert not any(engine.pool.map(attached, range(8), chunksize=1))
+
+
+def test_concurrent_runs():
+    '''Threads sharing an engine release workers once all are done'''
+    elections = list(random_elections(
+        21, trials=4, sizes=(100, 101), voters=(101, 102)
+    ))
+    results = {}
+    with SplitCycleEngine(processes=2, serial_threshold=5) as engine:
+        threads = [
+            threading.Thread(target=lambda i=i: results.update(
+                {i: engine.run(elections[i], range(100))}
+            ))
+            for i in range(4)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # no release waited for another thread's tasks to time out
+        assert time.perf_counter() - start < shared.RELEASE_TIMEOUT
+        assert not any(engine.pool.map(attached, range(8), chunksize=1))
+
+    # checked against the reference search in test_core.py
+    assert [results[i] for i in range(4)] == [
+        splitcycle(margins, engine='widest-path') for margins in elections
+    ]
+
+
+def test_release_timeout():
+    '''A release outlasting a busy worker leaves the barrier usable'''
+    timeout, shared.RELEASE_TIMEOUT = shared.RELEASE_TIMEOUT, 0.2
+    try:
+        pool, barrier = shared.start_pool(2)
+    finally:
+        shared.RELEASE_TIMEOUT = timeout
+
+    with pool:
+        busy = pool.apply_async(time.sleep, (1,))
+        time.sleep(0.1)
+        shared.release_workers(pool, barrier)
+        assert not barrier.broken
+
+        busy.get()
+        assert len(shared.release_workers(pool, barrier)) == 2
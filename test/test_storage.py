@@ -0,0 +1,60 @@
+'''Round trips of ballots through the binary ballot format'''
+
+import os
+import tempfile
+import numpy as np
+from splitcycle.core import margins_from_ballots
+from splitcycle.storage import BallotWriter, open_ballots, rank_dtype, \
+    write_ballots
+
+
+def test_round_trip():
+    '''Ballots written in batches read back with the same margins'''
+    rng = np.random.default_rng(9)
+    path = os.path.join(tempfile.mkdtemp(), 'election.ballots')
+    for n in (1, 3, 300):
+        batches = [
+            rng.integers(1, n + 2, (int(rng.integers(0, 50)), n))
+            for _ in range(4)
+        ]
+        with BallotWriter(path, n) as writer:
+            for batch in batches:
+                writer.write(batch)
+
+        ballots = open_ballots(path)
+        assert ballots.dtype == rank_dtype(n)
+        assert np.array_equal(ballots, np.vstack(batches))
+        assert np.array_equal(
+            margins_from_ballots(ballots),
+            margins_from_ballots(np.vstack(batches)),
+        )
+
+
+def test_zero_ballots():
+    '''A file without ballots reads back empty, with zero margins'''
+    path = os.path.join(tempfile.mkdtemp(), 'empty.ballots')
+    write_ballots(path, np.zeros((0, 4), dtype=int))
+    ballots = open_ballots(path)
+    assert ballots.shape == (0, 4)
+    assert not margins_from_ballots(ballots).any()
+
+
+def test_rank_range():
+    '''Ranks that do not fit the stored dtype are rejected'''
+    path = os.path.join(tempfile.mkdtemp(), 'bad.ballots')
+    for ranks in ([[1, 256]], [[-1, 1]]):
+        with BallotWriter(path, 2) as writer:
+            try:
+                writer.write(np.array(ranks))
+            except ValueError:
+                pass
+            else:
+                raise AssertionError('out of range ranks were written')
+            assert writer.n_ballots == 0
+
+    try:
+        open_ballots(os.devnull)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('a file without header was opened')
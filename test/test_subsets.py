@@ -0,0 +1,40 @@
+'''Randomized checks of candidate subset evaluation'''
+
+import numpy as np
+from elections import random_elections, reference_winners
+from splitcycle.subsets import all_subsets, subset_winners, \
+    winner_changes
+
+
+def restricted_winners(margins, subset):
+    '''Reference winners of the election restricted to `subset`'''
+    subset = list(subset)
+    return [
+        subset[i] for i in reference_winners(margins[np.ix_(subset, subset)])
+    ]
+
+
+def test_subset_winners():
+    '''Every subset's winners match the restricted reference election'''
+    for margins in random_elections(7, trials=60, sizes=(2, 7)):
+        n = margins.shape[0]
+        results = list(subset_winners(margins, batch_size=3))
+        assert [subset for subset, _ in results] == list(
+            all_subsets(n, min_size=2)
+        )
+        for subset, winners in results:
+            assert winners == restricted_winners(margins, subset)
+
+
+def test_winner_changes():
+    '''Changes are the subsets whose winners differ from the full ones'''
+    for margins in random_elections(70, trials=60, sizes=(2, 7)):
+        full = set(reference_winners(margins))
+        expected = []
+        for subset in all_subsets(margins.shape[0], min_size=2):
+            winners = restricted_winners(margins, subset)
+            kept = full.intersection(subset)
+            if kept and set(winners) != kept:
+                expected.append((subset, winners))
+
+        assert list(winner_changes(margins)) == expected
@@ -0,0 +1,72 @@
+'''Checks of simulation sweeps: reproducibility and resuming'''
+
+import csv
+import os
+import tempfile
+from elections import reference_winners
+from splitcycle.core import margins_from_ballots
+from splitcycle.sweep import chunk_rng, run_sweep, summarize, sweep_tasks
+from splitcycle.utils import gen_random_ballots
+
+GRID = (['ic', 'mallows-0.5'], [3, 5], [4, 9])
+
+
+def rows(path):
+    '''Rows of a sweep CSV file by chunk, without their timings'''
+    with open(path, newline='', encoding='utf-8') as file:
+        return sorted(
+            tuple(value for key, value in row.items() if key != 'seconds')
+            for row in csv.DictReader(file)
+        )
+
+
+def test_chunks_match_reference():
+    '''Every chunk's totals match the reference search'''
+    path = os.path.join(tempfile.mkdtemp(), 'sweep.csv')
+    run_sweep(path, *GRID, trials=10, chunk_size=4, processes=1)
+
+    tasks = {
+        (task['model'], task['candidates'], task['voters'], task['chunk']):
+            task
+        for task in sweep_tasks(*GRID, 10, chunk_size=4, seed=0)
+    }
+    for row in rows(path):
+        task = tasks[(row[0], int(row[1]), int(row[2]), int(row[3]))]
+        rng = chunk_rng(0, task['point'], task['chunk'])
+        winners = [
+            reference_winners(margins_from_ballots(gen_random_ballots(
+                task['voters'], task['candidates'], task['model'], rng
+            )))
+            for _ in range(task['trials'])
+        ]
+        assert int(row[4]) == task['trials']
+        assert int(row[5]) == sum(map(len, winners))
+        assert int(row[6]) == sum(len(w) > 1 for w in winners)
+
+    assert sum(
+        point['trials'] for point in summarize(path).values()
+    ) == 10 * 8
+
+
+def test_processes_and_resume():
+    '''Results do not depend on processes, and resuming completes them'''
+    directory = tempfile.mkdtemp()
+    serial = os.path.join(directory, 'serial.csv')
+    parallel = os.path.join(directory, 'parallel.csv')
+    assert run_sweep(serial, *GRID, trials=10, chunk_size=4, processes=1) \
+        == 24
+    assert run_sweep(parallel, *GRID, trials=10, chunk_size=4, processes=3) \
+        == 24
+    assert rows(serial) == rows(parallel)
+
+    # drop the last two rows and cut the one before in half
+    with open(parallel, encoding='utf-8') as file:
+        lines = file.readlines()
+    with open(parallel, 'w', encoding='utf-8') as file:
+        file.writelines(lines[:-3])
+        file.write(lines[-3][:len(lines[-3]) // 2])
+
+    assert run_sweep(parallel, *GRID, trials=10, chunk_size=4, processes=2) \
+        == 3
+    assert rows(serial) == rows(parallel)
+    assert run_sweep(parallel, *GRID, trials=10, chunk_size=4) == 0
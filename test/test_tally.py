@@ -0,0 +1,38 @@
+'''Checks of the streaming tallies against tallying all ballots at once'''
+
+import numpy as np
+from splitcycle.core import margins_from_ballots, splitcycle
+from splitcycle.tally import IncrementalCount, MarginsAccumulator
+
+
+def test_merge_rebuilt_tally():
+    '''A tally rebuilt without its ballot count still re-evaluates'''
+    count = IncrementalCount(3)
+    count.add(np.array([[1, 2, 3]] * 5))
+    assert count.winners() == [0]
+
+    precinct = margins_from_ballots(np.array([[3, 2, 1]] * 20))
+    count.merge(MarginsAccumulator.from_tally(precinct))
+    assert count.winners() == [2]
+
+
+def test_incremental_count_random():
+    '''Winners of a live count match recounting from scratch'''
+    rng = np.random.default_rng(6)
+    for _ in range(50):
+        n = int(rng.integers(2, 7))
+        count = IncrementalCount(n)
+        ballots = []
+        for _ in range(int(rng.integers(1, 6))):
+            batch = np.argsort(
+                rng.random((int(rng.integers(1, 20)), n)), axis=1
+            ) + 1
+            ballots.append(batch)
+            if rng.random() < 0.5:
+                count.add(batch)
+            else:
+                count.merge(MarginsAccumulator.from_tally(
+                    margins_from_ballots(batch).astype(np.int64)
+                ))
+            expected = splitcycle(margins_from_ballots(np.vstack(ballots)))
+            assert count.winners() == expected
@@ -0,0 +1,60 @@
+'''Randomized checks of defeat witnesses and their verifier'''
+
+import json
+import numpy as np
+from elections import random_elections, reference_winners
+from splitcycle.witnesses import splitcycle_witnesses, verify_witnesses
+
+
+def test_witnesses():
+    '''Witnesses name the reference winners and verify'''
+    for margins in random_elections(25, sizes=(1, 12)):
+        witnesses = splitcycle_witnesses(margins)
+        assert witnesses['winners'] == reference_winners(margins)
+        assert verify_witnesses(margins, witnesses)
+        assert verify_witnesses(margins, json.loads(json.dumps(witnesses)))
+
+
+def test_tampered_witnesses():
+    '''Witnesses of any other result, or broken ones, are rejected'''
+    rng = np.random.default_rng(250)
+    for margins in random_elections(250, sizes=(3, 12)):
+        witnesses = splitcycle_witnesses(margins)
+        n = margins.shape[0]
+
+        for candidate in range(n):
+            # claiming any other set of winners fails
+            claimed = set(witnesses['winners']) ^ {candidate}
+            assert not verify_witnesses(
+                margins, dict(witnesses, winners=sorted(claimed))
+            )
+
+        for key in ('defeats', 'splits'):
+            if not witnesses[key]:
+                continue
+            broken = json.loads(json.dumps(witnesses))
+            witness = broken[key][rng.integers(len(broken[key]))]
+            if rng.random() < 0.5:
+                # drop the witness
+                broken[key].remove(witness)
+            elif key == 'defeats':
+                # let the cut contain the defeating candidate
+                witness[2] = sorted(set(witness[2]) | {witness[0]})
+            else:
+                # run the path the wrong way
+                witness[2] = witness[2][::-1]
+            assert not verify_witnesses(margins, broken)
+
+    # out of range, repeated or boolean indices are not candidates
+    margins = np.array([[0, 1, 1], [-1, 0, 1], [-1, -1, 0]])
+    witnesses = splitcycle_witnesses(margins)
+    assert witnesses['winners'] == [0]
+    for winners in ([-3], [0, 0, -3], [True, False, False], [0, 0], [3]):
+        assert not verify_witnesses(margins, dict(witnesses, winners=winners))
+    for index, y in ((0, -1), (1, -1), (0, -2), (1, -2)):
+        broken = json.loads(json.dumps(witnesses))
+        broken['defeats'][index][1] = y
+        assert not verify_witnesses(margins, broken)
+    broken = json.loads(json.dumps(witnesses))
+    broken['defeats'][0][2] = [-2]
+    assert not verify_witnesses(margins, broken)